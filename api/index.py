@@ -1,4 +1,3 @@
-import html
 import os
 import sys
 from http.server import BaseHTTPRequestHandler
@@ -9,7 +8,15 @@ from fastapi.responses import HTMLResponse, Response
 # Add parent directory to path for Vercel serverless environment
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from cities import get_cities_list, map_city_payload
+from cities import map_city_payload
+from index_page import (
+    INDEX_CACHE_CONTROL,
+    STYLESHEET_PATH,
+    etag_matches,
+    get_index_link_header,
+    get_index_page,
+    get_stylesheet,
+)
 from api.poster import build_poster_from_payload, CITY_BY_NAME
 
 # FastAPI app for local development with `vercel dev`
@@ -18,20 +25,7 @@ app = FastAPI()
 
 def generate_html() -> str:
     """Generate the HTML page with city checkboxes."""
-    cities = get_cities_list()
-
-    # Use html.escape to handle city names with quotes (e.g., עין הנצי"ב)
-    city_checkboxes = "\n".join([
-        f'        <div class="city-option" data-name="{html.escape(city["name"], quote=True)}" data-selected="false"><span class="city-check-icon">✓</span><span class="city-name">{html.escape(city["name"])}</span><div class="offset-input"><input type="number" class="candle-offset" value="{city["candle_offset"]}" min="0" max="60" title="דקות לפני השקיעה"><span class="offset-label">ד\'</span></div></div>'
-        for city in cities
-    ])
-
-    # Read the HTML template from a file
-    template_path = os.path.join(os.path.dirname(__file__), "template.html")
-    with open(template_path, "r", encoding="utf-8") as f:
-        html_template = f.read()
-
-    return html_template.replace("CITY_CHECKBOXES_PLACEHOLDER", city_checkboxes)
+    return get_index_page()[0].decode("utf-8")
 
 
 class handler(BaseHTTPRequestHandler):
@@ -39,12 +33,25 @@ class handler(BaseHTTPRequestHandler):
 
     def do_GET(self):
         try:
-            html_content = generate_html()
+            # Built once per warm instance and served as ready-encoded bytes
+            body, _, etag, _ = get_index_page()
+
+            # Repeat visits revalidate and get an empty 304 instead of the page
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", INDEX_CACHE_CONTROL)
+                self.end_headers()
+                return
 
             self.send_response(200)
             self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", INDEX_CACHE_CONTROL)
+            self.send_header("Link", get_index_link_header())
             self.end_headers()
-            self.wfile.write(html_content.encode("utf-8"))
+            self.wfile.write(body)
         except Exception as e:
             error_msg = f"Internal Server Error: {e}".encode("utf-8")
             self.send_response(500)
@@ -57,7 +64,19 @@ class handler(BaseHTTPRequestHandler):
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """Serve the main HTML page (for local dev)."""
-    return generate_html()
+    return HTMLResponse(get_index_page()[0])
+
+
+@app.get(STYLESHEET_PATH)
+async def stylesheet(v: str = ""):
+    """Serve the page's split-out stylesheet (for local dev)."""
+    css, _, version = get_stylesheet()
+    # Versioned URLs never change content; anything else revalidates
+    if v == version:
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "no-cache"
+    return Response(content=css, media_type="text/css; charset=utf-8", headers={"Cache-Control": cache_control})
 
 
 @app.post("/poster")
@@ -12,8 +12,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 import base64
 import socket
 import tempfile
+import threading
+from collections import OrderedDict
 from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
@@ -73,7 +75,8 @@ def is_safe_url(url: str) -> bool:
         # Any parsing error means unsafe URL
         return False
 
-from make_shabbat_posts import generate_poster, DEFAULT_CITIES
+from make_shabbat_posts import generate_poster, DEFAULT_CITIES, IMG_SIZE, POSTER_FONTS
+from image_utils import fit_background, warm_font_cache
 from cities import get_cities_list, build_city_lookup, map_city_payload
 from rate_limiter import RateLimiter
 
@@ -84,6 +87,45 @@ CITY_BY_NAME = build_city_lookup(GEOJSON_CITIES)
 # Rate limiter: 10 requests per minute per IP
 _rate_limiter = RateLimiter(max_requests=10, window_seconds=60)
 
+# Downloaded imageUrl backgrounds by URL: (temp file path, ETag, Last-Modified).
+# Repeat requests revalidate with a conditional GET and reuse the file on a
+# 304, which skips the download and keeps fit_background's cache warm since
+# the path stays the same. Only responses with a validator are kept.
+_IMAGE_URL_CACHE_MAX_ENTRIES = 32
+_image_url_cache: "OrderedDict[str, Tuple[str, Optional[str], Optional[str]]]" = OrderedDict()
+_image_url_cache_lock = threading.Lock()
+
+
+def _get_cached_image_url(url: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+    """Return the cached download for a URL if its file is still on disk."""
+    with _image_url_cache_lock:
+        entry = _image_url_cache.get(url)
+        if entry is None:
+            return None
+        if not os.path.isfile(entry[0]):
+            # Temp dir was cleaned up underneath us; fetch afresh
+            del _image_url_cache[url]
+            return None
+        _image_url_cache.move_to_end(url)
+        return entry
+
+
+def _remember_image_url(url: str, path: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+    """Cache a downloaded image file, evicting the least recently used entries."""
+    if not etag and not last_modified:
+        return
+    with _image_url_cache_lock:
+        _image_url_cache[url] = (path, etag, last_modified)
+        _image_url_cache.move_to_end(url)
+        while len(_image_url_cache) > _IMAGE_URL_CACHE_MAX_ENTRIES:
+            _image_url_cache.popitem(last=False)
+
+
+def clear_image_url_cache() -> None:
+    """Clear the downloaded imageUrl cache. Useful for testing."""
+    with _image_url_cache_lock:
+        _image_url_cache.clear()
+
 
 def _detect_image_suffix(image_data: bytes) -> str:
     """Detect image/video format from magic bytes and return appropriate file suffix."""
@@ -103,11 +145,76 @@ def _detect_image_suffix(image_data: bytes) -> str:
         return '.jpg'
 
 
-def build_poster_from_payload(payload: Dict[str, Any]) -> bytes:
+def _default_background_path(omer_mode: bool) -> Optional[str]:
+    """Return the bundled default background for the mode, or None if missing."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # For Omer mode, use the Omer-specific default background; fall back to
+    # the Shabbat default if it is missing (or not in Omer mode)
+    names = ("omer_default.png", "shabat_default.png") if omer_mode else ("shabat_default.png",)
+    for name in names:
+        for path in (
+            # Vercel serverless - api folder (highest priority)
+            os.path.join(os.path.dirname(__file__), name),
+            # Local development - public folder
+            os.path.join(project_root, "public", "static", "backgrounds", name),
+        ):
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def warm_up() -> None:
+    """
+    Load the poster fonts and decode the default backgrounds ahead of time.
+
+    Called at server startup so the first request doesn't pay for parsing
+    the TTFs and decoding/resizing the default images.
+    """
+    warm_font_cache(POSTER_FONTS)
+    for omer_mode in (False, True):
+        path = _default_background_path(omer_mode)
+        if path is not None:
+            fit_background(path, IMG_SIZE)
+
+
+def negotiate_output_format(accept: Optional[str]) -> str:
+    """
+    Pick the still poster encoding from an Accept header.
+
+    Returns "webp" only when the client lists image/webp explicitly (with a
+    non-zero q); wildcards like */* keep PNG, which every client can save.
+    """
+    for part in (accept or "").lower().split(","):
+        media_type, _, params = part.partition(";")
+        if media_type.strip() != "image/webp":
+            continue
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return "webp" if float(value) > 0 else "png"
+                except ValueError:
+                    return "png"
+        return "webp"
+    return "png"
+
+
+def poster_media_type(poster_bytes: bytes) -> str:
+    """Detect a generated poster's content type from its magic bytes."""
+    # GIF starts with "GIF87a" or "GIF89a", WebP with "RIFF....WEBP"
+    if poster_bytes[:6] in (b'GIF87a', b'GIF89a'):
+        return "image/gif"
+    if poster_bytes[:4] == b'RIFF' and poster_bytes[8:12] == b'WEBP':
+        return "image/webp"
+    return "image/png"
+
+
+def build_poster_from_payload(payload: Dict[str, Any], output_format: str = "png") -> bytes:
     """
     Pure logic function that:
     - Receives a dict representing the JSON payload of a request
-    - Returns PNG bytes for a single generated poster.
+    - Returns PNG bytes for a single generated poster (WebP when
+      output_format="webp"; animated backgrounds always give a GIF).
 
     Expected payload structure (all fields optional):
     {
@@ -225,66 +332,55 @@ def build_poster_from_payload(payload: Dict[str, Any]) -> bytes:
         if not is_safe_url(image_url):
             raise ValueError("Unsafe imageUrl: URL points to internal/private resource")
 
+        cached = _get_cached_image_url(image_url)
         try:
             headers = {"User-Agent": "Mozilla/5.0"}
+            # Revalidate a previous download instead of fetching it again
+            if cached is not None:
+                if cached[1]:
+                    headers["If-None-Match"] = cached[1]
+                if cached[2]:
+                    headers["If-Modified-Since"] = cached[2]
             # Optimized timeout for Vercel free tier (10s limit) with simple retry
             r = None
             last_error = None
             for attempt in range(2):
                 try:
                     r = requests.get(image_url, timeout=6, headers=headers)
-                    if r.status_code == 200:
+                    if r.status_code == 200 or (r.status_code == 304 and cached is not None):
                         break
                 except requests.RequestException as e:
                     last_error = e
                     if attempt == 0:
                         continue  # Retry once
                     raise
-            if r is None or r.status_code != 200:
+            if r is None or r.status_code not in (200, 304):
                 raise RuntimeError(f"Failed to download image from imageUrl after retries: {last_error or 'HTTP error'}")
-            # Detect format from magic bytes
-            suffix = _detect_image_suffix(r.content)
-            # Save to a temporary file (cloud-safe: uses /tmp)
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            tmp.write(r.content)
-            tmp.close()
-            image_path = tmp.name
+            if r.status_code == 304:
+                # Not modified: reuse the file from the earlier download
+                image_path = cached[0]
+            else:
+                # Detect format from magic bytes
+                suffix = _detect_image_suffix(r.content)
+                # Save to a temporary file (cloud-safe: uses /tmp)
+                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+                tmp.write(r.content)
+                tmp.close()
+                image_path = tmp.name
+                _remember_image_url(
+                    image_url, image_path, r.headers.get("ETag"), r.headers.get("Last-Modified")
+                )
         except requests.RequestException as e:
             raise RuntimeError(f"Failed to download image from imageUrl: {e}")
 
     # Priority 3: image (local path) - already set from payload.get("image")
     # Priority 4: Fallback - use mode-specific default or first image from images/ folder
     elif image_path is None:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-        # For Omer mode, use the Omer-specific default background
-        if omer_mode:
-            omer_default_paths = [
-                # Vercel serverless - api folder (highest priority)
-                os.path.join(os.path.dirname(__file__), "omer_default.png"),
-                # Local development - public folder
-                os.path.join(project_root, "public", "static", "backgrounds", "omer_default.png"),
-            ]
-            for path in omer_default_paths:
-                if os.path.isfile(path):
-                    image_path = path
-                    break
-
-        # If no Omer default found (or not in Omer mode), try Shabbat default
-        if image_path is None:
-            shabat_default_paths = [
-                # Vercel serverless - api folder (highest priority)
-                os.path.join(os.path.dirname(__file__), "shabat_default.png"),
-                # Local development - public folder
-                os.path.join(project_root, "public", "static", "backgrounds", "shabat_default.png"),
-            ]
-            for path in shabat_default_paths:
-                if os.path.isfile(path):
-                    image_path = path
-                    break
+        image_path = _default_background_path(omer_mode)
 
         # If no Shabbat default found, use generic fallback from images folder
         if image_path is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             exts = {".jpg", ".jpeg", ".png", ".webp"}
             images_dir = os.path.join(project_root, "images")
             all_files = sorted(os.listdir(images_dir))
@@ -341,6 +437,7 @@ def build_poster_from_payload(payload: Dict[str, Any]) -> bytes:
         omer_date=omer_date,
         omer_day=omer_day_direct,
         nusach=nusach,
+        output_format=output_format,
     )
 
     return poster_bytes
@@ -395,21 +492,17 @@ class handler(BaseHTTPRequestHandler):
             # Map city names to full city objects with coordinates
             map_city_payload(payload, CITY_BY_NAME)
 
-            # Generate poster
-            poster_bytes = build_poster_from_payload(payload)
-
-            # Detect output format from magic bytes
-            # GIF starts with "GIF87a" or "GIF89a", PNG starts with \x89PNG
-            if poster_bytes[:6] in (b'GIF87a', b'GIF89a'):
-                content_type = "image/gif"
-            else:
-                content_type = "image/png"
+            # Generate poster, as WebP for clients that ask for it
+            output_format = negotiate_output_format(self.headers.get("Accept"))
+            poster_bytes = build_poster_from_payload(payload, output_format)
+            content_type = poster_media_type(poster_bytes)
 
             # Send successful response
             self.send_response(200)
             self.send_header("Content-Type", content_type)
             self.send_header("Content-Length", str(len(poster_bytes)))
             self.send_header("Cache-Control", "public, max-age=3600")
+            self.send_header("Vary", "Accept")
             self.send_header("Access-Control-Allow-Origin", "*")
             self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
             self.send_header("Access-Control-Allow-Headers", "Content-Type")
@@ -0,0 +1,44 @@
+"""
+Serve the index page's stylesheet.
+
+The CSS is split out of api/template.html and linked as /app.css?v=<hash>,
+so responses for the current version are cached by browsers indefinitely.
+"""
+
+import os
+import sys
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+# Add parent directory to path for Vercel serverless environment
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from index_page import get_stylesheet
+
+
+class handler(BaseHTTPRequestHandler):
+    """Vercel serverless function entrypoint for the stylesheet."""
+
+    def do_GET(self):
+        try:
+            css, _, version = get_stylesheet()
+
+            # Versioned URLs never change content; anything else revalidates
+            requested_version = parse_qs(urlparse(self.path).query).get("v", [None])[0]
+            if requested_version == version:
+                cache_control = "public, max-age=31536000, immutable"
+            else:
+                cache_control = "no-cache"
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/css; charset=utf-8")
+            self.send_header("Content-Length", str(len(css)))
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            self.wfile.write(css)
+        except Exception as e:
+            error_msg = f"Internal Server Error: {e}".encode("utf-8")
+            self.send_response(500)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(error_msg)
@@ -11,7 +11,7 @@ from http.server import BaseHTTPRequestHandler
 # Add parent directory to path for Vercel serverless environment
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from make_shabbat_posts import find_next_sequence
+from calendar_utils import iter_sequences
 from hebcal_api import get_parsha_from_hebcal
 from translations import translate_yomtov
 
@@ -23,9 +23,7 @@ def get_upcoming_events():
     # Calculate end date as one year from today
     one_year_ahead = date(current_date.year + 1, current_date.month, current_date.day)
 
-    i = 0
-    while current_date < one_year_ahead:
-        seq_start, seq_end, event_type, event_name = find_next_sequence(current_date)
+    for i, (seq_start, seq_end, event_type, event_name) in enumerate(iter_sequences(current_date)):
 
         # Get parsha for Shabbat
         parsha = None
@@ -60,9 +58,9 @@ def get_upcoming_events():
             "isNext": i == 0,
         })
 
-        # Move to day after this sequence ends
-        current_date = seq_end + timedelta(days=1)
-        i += 1
+        # Stop once the next search would start a year or more ahead
+        if seq_end + timedelta(days=1) >= one_year_ahead:
+            break
 
     return events
 
@@ -7,14 +7,16 @@ including finding event sequences, calculating times, and determining event date
 
 from datetime import date, datetime, timedelta
 from functools import lru_cache
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from jewcal import JewCal
 from jewcal.models.zmanim import Location
 
 
-@lru_cache(maxsize=128)
-def _get_jewcal_cached(gregorian_date: date, diaspora: bool = False) -> JewCal:
+# Sized to hold a full year of probe days (get_upcoming_events walks 365 days
+# through find_next_sequence/find_event_sequence) plus the lookbacks.
+@lru_cache(maxsize=512)
+def get_jewcal_cached(gregorian_date: date, diaspora: bool = False) -> JewCal:
     """Get a cached JewCal instance for a specific date (without location).
 
     Args:
@@ -27,7 +29,7 @@ def _get_jewcal_cached(gregorian_date: date, diaspora: bool = False) -> JewCal:
     return JewCal(gregorian_date=gregorian_date, diaspora=diaspora)
 
 
-@lru_cache(maxsize=128)
+@lru_cache(maxsize=1024)
 def _get_jewcal_with_location_cached(
     gregorian_date: date,
     diaspora: bool,
@@ -60,10 +62,38 @@ def _get_jewcal_with_location_cached(
     return JewCal(gregorian_date=gregorian_date, diaspora=diaspora, location=location)
 
 
+# Day actions that belong to a candle-lighting (Shabbat/Yom Tov) sequence
+_CANDLE_ACTIONS = ("Candles", "Havdalah")
+
+
+@lru_cache(maxsize=512)
+def _get_day_events(gregorian_date: date) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Get the (action, yomtov, shabbos) event summary for an Israel date.
+
+    All three are None when the day has no events. The sequence scanners
+    probe the same days repeatedly, so they share this flat, cached summary
+    instead of re-querying JewCal event objects on every step.
+
+    Args:
+        gregorian_date: The Gregorian date
+
+    Returns:
+        Tuple of (events.action, events.yomtov, events.shabbos)
+    """
+    jewcal = get_jewcal_cached(gregorian_date, False)
+    if not jewcal.has_events():
+        return None, None, None
+    events = jewcal.events
+    return events.action, events.yomtov, events.shabbos
+
+
 def clear_jewcal_cache() -> None:
     """Clear the JewCal cache. Useful for testing."""
-    _get_jewcal_cached.cache_clear()
+    get_jewcal_cached.cache_clear()
     _get_jewcal_with_location_cached.cache_clear()
+    _get_day_events.cache_clear()
+    _get_sequence_events_cached.cache_clear()
+    get_sequence_zmanim.cache_clear()
 
 
 def next_friday(d: date) -> date:
@@ -95,11 +125,10 @@ def is_end_of_holiday_sequence(target_date: date) -> bool:
         True if this is the last day of the sequence
     """
     next_day = target_date + timedelta(days=1)
-    next_jewcal = _get_jewcal_cached(next_day, False)
+    next_action, _, _ = _get_day_events(next_day)
 
     # If next day has events that require candle lighting, current day is not the end
-    if (next_jewcal.has_events() and
-        next_jewcal.events.action in ["Candles", "Havdalah"]):
+    if next_action in _CANDLE_ACTIONS:
         return False
 
     return True
@@ -138,7 +167,7 @@ def get_effective_start_date(now: Optional[datetime] = None) -> date:
     today = now.date()
 
     # Check if today has a havdalah event (end of sequence)
-    today_jewcal = _get_jewcal_cached(today, False)
+    today_jewcal = get_jewcal_cached(today, False)
     if not today_jewcal.has_events():
         return today
 
@@ -198,15 +227,14 @@ def find_event_sequence(start_date: date) -> tuple[date, date, str, str]:
     # Only go back if the previous day is part of a continuous sequence
     while True:
         prev_day = current_date - timedelta(days=1)
-        prev_jewcal = _get_jewcal_cached(prev_day, False)
+        prev_action, _, _ = _get_day_events(prev_day)
 
         # Only continue backwards if:
         # 1. Previous day has events
         # 2. Previous day does NOT end with Havdalah (meaning it continues to current day)
-        if (prev_jewcal.has_events() and
-            prev_jewcal.events.action in ["Candles", "Havdalah"]):
+        if prev_action in _CANDLE_ACTIONS:
             # If previous day ends with Havdalah, it's a separate sequence
-            if prev_jewcal.events.action == "Havdalah":
+            if prev_action == "Havdalah":
                 break
             # Otherwise, continue backwards
             current_date = prev_day
@@ -217,30 +245,29 @@ def find_event_sequence(start_date: date) -> tuple[date, date, str, str]:
     # Find the end of the sequence
     current_date = start_date
     while True:
-        jewcal = _get_jewcal_cached(current_date, False)
+        action, yomtov, shabbos = _get_day_events(current_date)
 
-        if jewcal.has_events():
-            if jewcal.events.yomtov:
+        if yomtov is not None or shabbos is not None:
+            if yomtov:
                 main_event_type = "yomtov"
-                main_event_name = jewcal.events.yomtov
-            elif jewcal.events.shabbos:
+                main_event_name = yomtov
+            elif shabbos:
                 main_event_type = "shabbos"
-                main_event_name = jewcal.events.shabbos
+                main_event_name = shabbos
 
             sequence_end = current_date
 
             # Check if sequence continues - only if current day is NOT the end (no Havdalah)
             # OR if the next day is the immediate continuation (like Yom Tov followed by Shabbat on the same day)
             next_day = current_date + timedelta(days=1)
-            next_jewcal = _get_jewcal_cached(next_day, False)
+            next_action, _, _ = _get_day_events(next_day)
 
             # Only continue if:
             # 1. Current day doesn't end with Havdalah (meaning it continues to next day)
             # 2. OR next day has Candles AND current day action is Candles (continuous sequence)
-            if (next_jewcal.has_events() and
-                next_jewcal.events.action in ["Candles", "Havdalah"]):
+            if next_action in _CANDLE_ACTIONS:
                 # If current day has Havdalah, the sequence ends here (no continuation)
-                if jewcal.events.action == "Havdalah":
+                if action == "Havdalah":
                     break
                 # Otherwise, continue to next day
                 current_date = next_day
@@ -252,51 +279,56 @@ def find_event_sequence(start_date: date) -> tuple[date, date, str, str]:
     return sequence_start, sequence_end, main_event_type, main_event_name
 
 
+def _next_candle_day(start_base: date, horizon: int = 14) -> Optional[date]:
+    """Return the first day from start_base with a Candles/Havdalah action, or None."""
+    for i in range(horizon):
+        check_date = start_base + timedelta(days=i)
+        action, _, _ = _get_day_events(check_date)
+        if action in _CANDLE_ACTIONS:
+            return check_date
+    return None
+
+
 def find_next_sequence(start_base: date) -> tuple[date, date, str, str]:
     """Find the next event sequence starting from start_base.
     Returns: (start_date, end_date, event_type, event_name)
     """
-    current_date = start_base
-
-    # Check up to 14 days ahead to find the next event
-    for i in range(14):
-        check_date = current_date + timedelta(days=i)
-
-        # Create a temporary jewcal object to check for events
-        temp_jewcal = _get_jewcal_cached(check_date, False)
-
-        if temp_jewcal.has_events():
-            # Check if this is an event that requires candle lighting (prioritize Yom Tov)
-            if temp_jewcal.events.action in ["Candles", "Havdalah"]:
-                # Found an event, now find the complete sequence
-                return find_event_sequence(check_date)
+    event_date = _next_candle_day(start_base)
+    if event_date is not None:
+        # Found an event, now find the complete sequence
+        return find_event_sequence(event_date)
 
     # Fallback to next Friday if no special events found
     next_friday_date = next_friday(start_base)
     return find_event_sequence(next_friday_date)
 
 
-def find_next_event_date(start_base: date) -> tuple[date, str, str]:
-    """Find the next Shabbat or Yom Tov event starting from start_base."""
-    current_date = start_base
+def iter_sequences(start_base: date) -> Iterator[Tuple[date, date, str, str]]:
+    """Yield consecutive event sequences starting from start_base.
 
-    # Check up to 14 days ahead to find the next event
-    for i in range(14):
-        check_date = current_date + timedelta(days=i)
+    Each search resumes the day after the previous sequence ends, so a batch
+    of N sequences is one forward walk over the calendar instead of N
+    independent searches from scratch.
 
-        # Create a temporary jewcal object to check for events
-        temp_jewcal = _get_jewcal_cached(check_date, False)
+    Yields:
+        (start_date, end_date, event_type, event_name) tuples, in date order
+    """
+    current_date = start_base
+    while True:
+        sequence = find_next_sequence(current_date)
+        yield sequence
+        current_date = sequence[1] + timedelta(days=1)
 
-        if temp_jewcal.has_events():
-            # Check if this is an event that requires candle lighting (prioritize Yom Tov)
-            if temp_jewcal.events.action in ["Candles", "Havdalah"]:
-                if temp_jewcal.events.yomtov:
-                    event_type = "yomtov"
-                    event_name = temp_jewcal.events.yomtov
-                else:
-                    event_type = "shabbos"
-                    event_name = temp_jewcal.events.shabbos
-                return check_date, event_type, event_name
+
+def find_next_event_date(start_base: date) -> tuple[date, str, str]:
+    """Find the next Shabbat or Yom Tov event starting from start_base."""
+    event_date = _next_candle_day(start_base)
+    if event_date is not None:
+        # Prioritize Yom Tov over Shabbat
+        _, yomtov, shabbos = _get_day_events(event_date)
+        if yomtov:
+            return event_date, "yomtov", yomtov
+        return event_date, "shabbos", shabbos
 
     # Fallback to next Friday if no special events found
     return next_friday(start_base), "shabbos", "Shabbos"
@@ -359,51 +391,45 @@ def jewcal_times_for_date(lat: float, lon: float, target_date: date, candle_offs
     }
 
 
-def jewcal_times_for_sequence(
-    lat: float,
-    lon: float,
-    start_date: date,
-    end_date: date,
-    candle_offset: int
-) -> Dict[str, Any]:
+def get_sequence_event_info(start_date: date, end_date: date) -> Dict[str, Any]:
     """
-    Calculate times for a complete event sequence (Shabbat or holiday sequence).
+    Get the location-independent details of an event sequence.
 
-    This handles multi-day sequences like Yom Tov followed by Shabbat, returning
-    the candle lighting time from the first day and havdalah from the last day.
+    Event names, the start-day action and the parsha are the same for every
+    city in Israel, so they are computed once per sequence (and cached)
+    rather than once per city.
 
     Args:
-        lat: Latitude of the location
-        lon: Longitude of the location
         start_date: First day of the sequence
         end_date: Last day of the sequence
-        candle_offset: Minutes before sunset for candle lighting
 
     Returns:
-        Dict with keys: parsha, event_name, event_type, candle, havdalah,
-        start_date, end_date, action
+        Dict with keys: parsha, event_name, event_type, action
     """
     # Import here to avoid circular dependency
     from make_shabbat_posts import get_parsha_from_hebcal
 
-    # Get candle lighting time from the start of the sequence
-    # Use cached version with location parameters
-    start_jewcal = _get_jewcal_with_location_cached(start_date, False, lat, lon, candle_offset)
-    candle_time = None
-    if start_jewcal.zmanim:
-        start_zmanim = start_jewcal.zmanim.to_dict()
-        if start_zmanim.get('hadlokas_haneiros'):
-            candle_time = start_zmanim['hadlokas_haneiros']
+    event_name, event_type, action, involves_shabbat = _get_sequence_events_cached(start_date, end_date)
 
-    # Get havdalah time from the end of the sequence
-    end_jewcal = _get_jewcal_with_location_cached(end_date, False, lat, lon, candle_offset)
-    havdalah_time = None
-    if end_jewcal.zmanim:
-        end_zmanim = end_jewcal.zmanim.to_dict()
-        if end_zmanim.get('tzeis_hakochavim'):
-            havdalah_time = end_zmanim['tzeis_hakochavim']
-        elif end_zmanim.get('tzeis_minutes'):
-            havdalah_time = end_zmanim['tzeis_minutes']
+    # Get parsha information only if sequence involves Shabbat. Not part of the
+    # cached tuple: get_parsha_from_hebcal decides what is safe to remember.
+    parsha = get_parsha_from_hebcal(start_date) if involves_shabbat else None
+
+    return {
+        "parsha": parsha,
+        "event_name": event_name,
+        "event_type": event_type,
+        "action": action,
+    }
+
+
+@lru_cache(maxsize=64)
+def _get_sequence_events_cached(
+    start_date: date, end_date: date
+) -> Tuple[Optional[str], Optional[str], Optional[str], bool]:
+    """Cached (event_name, event_type, action, involves_shabbat) for a sequence."""
+    start_action, start_yomtov, start_shabbos = _get_day_events(start_date)
+    _, end_yomtov, end_shabbos = _get_day_events(end_date)
 
     # Determine event type and name
     # Prefer the end event if it's more significant (e.g., Simchat Torah over Hoshana Rabba)
@@ -416,21 +442,19 @@ def jewcal_times_for_sequence(
     end_event_name = None
     end_event_type = None
 
-    if start_jewcal.has_events():
-        if start_jewcal.events.yomtov:
-            start_event_type = "yomtov"
-            start_event_name = start_jewcal.events.yomtov
-        elif start_jewcal.events.shabbos:
-            start_event_type = "shabbos"
-            start_event_name = start_jewcal.events.shabbos
-
-    if end_jewcal.has_events():
-        if end_jewcal.events.yomtov:
-            end_event_type = "yomtov"
-            end_event_name = end_jewcal.events.yomtov
-        elif end_jewcal.events.shabbos:
-            end_event_type = "shabbos"
-            end_event_name = end_jewcal.events.shabbos
+    if start_yomtov:
+        start_event_type = "yomtov"
+        start_event_name = start_yomtov
+    elif start_shabbos:
+        start_event_type = "shabbos"
+        start_event_name = start_shabbos
+
+    if end_yomtov:
+        end_event_type = "yomtov"
+        end_event_name = end_yomtov
+    elif end_shabbos:
+        end_event_type = "shabbos"
+        end_event_name = end_shabbos
 
     # Step 1: Ignore "regular day" events as start event
     # These are days without melacha prohibition: Chol HaMoed and Hoshana Rabba
@@ -459,21 +483,96 @@ def jewcal_times_for_sequence(
         event_type = effective_start_type
         event_name = effective_start_event
 
-    # Get parsha information only if sequence involves Shabbat
-    parsha = None
-    if (event_type == "shabbos" or
+    involves_shabbat = (
+        event_type == "shabbos" or
         any((start_date + timedelta(days=i)).weekday() == 5
-            for i in range((end_date - start_date).days + 1))):
-        parsha = get_parsha_from_hebcal(start_date)
+            for i in range((end_date - start_date).days + 1))
+    )
+
+    return event_name, event_type, start_action, involves_shabbat
+
+
+@lru_cache(maxsize=1024)
+def get_sequence_zmanim(
+    lat: float,
+    lon: float,
+    start_date: date,
+    end_date: date,
+    candle_offset: int
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Get the per-city candle lighting and havdalah times for a sequence.
+
+    Candle lighting comes from the first day and havdalah from the last day.
+    Results are cached, so repeated (city, sequence) lookups skip the
+    zmanim to_dict() conversions.
+
+    Args:
+        lat: Latitude of the location
+        lon: Longitude of the location
+        start_date: First day of the sequence
+        end_date: Last day of the sequence
+        candle_offset: Minutes before sunset for candle lighting
+
+    Returns:
+        Tuple of (candle, havdalah) ISO strings, each None if unavailable
+    """
+    # Get candle lighting time from the start of the sequence
+    # Use cached version with location parameters
+    start_jewcal = _get_jewcal_with_location_cached(start_date, False, lat, lon, candle_offset)
+    candle_time = None
+    if start_jewcal.zmanim:
+        start_zmanim = start_jewcal.zmanim.to_dict()
+        if start_zmanim.get('hadlokas_haneiros'):
+            candle_time = start_zmanim['hadlokas_haneiros']
+
+    # Get havdalah time from the end of the sequence
+    end_jewcal = _get_jewcal_with_location_cached(end_date, False, lat, lon, candle_offset)
+    havdalah_time = None
+    if end_jewcal.zmanim:
+        end_zmanim = end_jewcal.zmanim.to_dict()
+        if end_zmanim.get('tzeis_hakochavim'):
+            havdalah_time = end_zmanim['tzeis_hakochavim']
+        elif end_zmanim.get('tzeis_minutes'):
+            havdalah_time = end_zmanim['tzeis_minutes']
+
+    return candle_time or None, havdalah_time or None
+
+
+def jewcal_times_for_sequence(
+    lat: float,
+    lon: float,
+    start_date: date,
+    end_date: date,
+    candle_offset: int
+) -> Dict[str, Any]:
+    """
+    Calculate times for a complete event sequence (Shabbat or holiday sequence).
+
+    This handles multi-day sequences like Yom Tov followed by Shabbat, returning
+    the candle lighting time from the first day and havdalah from the last day.
+
+    Args:
+        lat: Latitude of the location
+        lon: Longitude of the location
+        start_date: First day of the sequence
+        end_date: Last day of the sequence
+        candle_offset: Minutes before sunset for candle lighting
+
+    Returns:
+        Dict with keys: parsha, event_name, event_type, candle, havdalah,
+        start_date, end_date, action
+    """
+    event_info = get_sequence_event_info(start_date, end_date)
+    candle_time, havdalah_time = get_sequence_zmanim(lat, lon, start_date, end_date, candle_offset)
 
     return {
-        "parsha": parsha,
-        "event_name": event_name,
-        "event_type": event_type,
-        "candle": candle_time if candle_time else None,
-        "havdalah": havdalah_time if havdalah_time else None,
+        "parsha": event_info["parsha"],
+        "event_name": event_info["event_name"],
+        "event_type": event_info["event_type"],
+        "candle": candle_time,
+        "havdalah": havdalah_time,
         "start_date": start_date,
         "end_date": end_date,
-        "action": start_jewcal.events.action if start_jewcal.has_events() else None
+        "action": event_info["action"],
     }
-
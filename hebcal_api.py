@@ -9,14 +9,21 @@ Local parsha data (parsha_data.json) is used first for fast lookups,
 with API fallback for dates not in the local dataset.
 """
 
+import bisect
+import hashlib
 import json
 import os
+import re
+import tempfile
+import time
 from datetime import date, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
-from jewcal import JewCal
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from calendar_utils import get_jewcal_cached
 from translations import translate_parsha
 
 # Timezone constant for Hebcal API
@@ -36,11 +43,105 @@ if os.path.exists(_parsha_file):
         print(f"Warning: Could not load local parsha data: {e}")
 
 
+# ========= HTTP SESSION =========
+# Shared session so repeated Hebcal fetches reuse the pooled keep-alive
+# connection instead of paying a fresh TCP/TLS handshake each time.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        # Also retry rate limiting and transient gateway errors, not just
+        # connection failures. Never retry read timeouts: one slow response
+        # already spends the full read budget on the request path.
+        max_retries=Retry(
+            total=2,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(429, 502, 503, 504),
+        ),
+    ),
+)
+_SESSION.headers.update({"User-Agent": "shabbat-posts/1.0"})
+
+# (connect, read) timeouts: an unreachable host fails fast, while a slow but
+# live response still gets the full read budget
+_HEBCAL_TIMEOUT = (3.05, 30)
+
+
 # ========= HEBCAL API CACHE =========
 # Cache to store Hebcal API responses by year - avoids redundant API calls
 # Key: year (int), Value: API response data (dict)
 _hebcal_cache: Dict[int, Dict[str, Any]] = {}
 
+# Per-year date -> parsha title index over the cached responses, so each
+# lookup is a dict hit instead of a scan of the year's ~300 items
+_parsha_index_cache: Dict[int, Dict[str, str]] = {}
+
+# Per-year sorted parashat dates (ISO strings sort chronologically), for
+# bisecting to the closest reading on or before a date
+_parsha_dates_cache: Dict[int, List[str]] = {}
+
+# Resolved Hebrew parsha per Saturday (only when Hebcal data was available)
+_parsha_by_saturday: Dict[date, Optional[str]] = {}
+
+# Years whose fetch recently failed, so an outage costs one timeout per year
+# instead of one per city/date. Key: year, Value: time.monotonic() of failure
+_hebcal_failures: Dict[int, float] = {}
+_FAILURE_RETRY_SECONDS = 300
+
+# Persistent cache so reruns skip the HTTPS round-trip entirely. Yearly
+# calendars are deterministic, so entries only expire to pick up upstream
+# corrections. Files are keyed by a hash of the full URL, so changing the
+# query parameters naturally invalidates old entries.
+_DISK_CACHE_DIR = os.getenv(
+    "HEBCAL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "hebcal_cache")
+)
+_DISK_CACHE_MAX_AGE = 365 * 24 * 60 * 60  # seconds
+
+# Cache entries are named <sha1 of URL>.json (see _disk_cache_path)
+_DISK_CACHE_NAME_RE = re.compile(r"[0-9a-f]{40}\.json")
+
+
+def _disk_cache_path(url: str) -> str:
+    """Return the on-disk cache file path for a Hebcal URL."""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(_DISK_CACHE_DIR, f"{digest}.json")
+
+
+def _read_disk_cache(url: str) -> Optional[Dict[str, Any]]:
+    """Load a cached Hebcal response from disk, or None if missing/stale."""
+    path = _disk_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) > _DISK_CACHE_MAX_AGE:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_disk_cache(url: str, data: Dict[str, Any]) -> None:
+    """Persist a Hebcal response to disk; failures are non-fatal."""
+    path = _disk_cache_path(url)
+    tmp_path = None
+    try:
+        os.makedirs(_DISK_CACHE_DIR, exist_ok=True)
+        # A unique temp file per write, so concurrent writers (threads in the
+        # service, or other processes) never share one
+        fd, tmp_path = tempfile.mkstemp(dir=_DISK_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
 
 def _get_hebcal_data_for_year(year: int) -> Optional[Dict[str, Any]]:
     """
@@ -56,25 +157,63 @@ def _get_hebcal_data_for_year(year: int) -> Optional[Dict[str, Any]]:
     if year in _hebcal_cache:
         return _hebcal_cache[year]
 
-    # Fetch from API
     url = _build_hebcal_url(year)
+
+    # Then the on-disk cache from previous runs
+    data = _read_disk_cache(url)
+    if data is not None:
+        _hebcal_cache[year] = data
+        return data
+
+    # Don't hammer an unreachable API; the local data covers the gap
+    failed_at = _hebcal_failures.get(year)
+    if failed_at is not None and time.monotonic() - failed_at < _FAILURE_RETRY_SECONDS:
+        return None
+
+    # Fetch from API
     try:
-        response = requests.get(url, timeout=30)
+        response = _SESSION.get(url, timeout=_HEBCAL_TIMEOUT)
         response.raise_for_status()
         data = response.json()
 
         # Store in cache for future use
         _hebcal_cache[year] = data
+        _hebcal_failures.pop(year, None)
+        _write_disk_cache(url, data)
         return data
 
     except Exception as e:
         print(f"Warning: Could not fetch Hebcal data for year {year}: {e}")
+        _hebcal_failures[year] = time.monotonic()
         return None
 
 
-def clear_hebcal_cache() -> None:
-    """Clear the Hebcal API cache. Useful for testing or memory management."""
+def clear_hebcal_cache(disk: bool = False) -> None:
+    """
+    Clear the in-memory Hebcal caches. Useful for testing or memory management.
+
+    Args:
+        disk: Also delete this module's cached responses from _DISK_CACHE_DIR.
+            Only files named like its own entries are removed, since the
+            directory is configurable and may be shared.
+    """
     _hebcal_cache.clear()
+    _parsha_index_cache.clear()
+    _parsha_dates_cache.clear()
+    _parsha_by_saturday.clear()
+    _hebcal_failures.clear()
+    if not disk:
+        return
+    try:
+        names = os.listdir(_DISK_CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        if _DISK_CACHE_NAME_RE.fullmatch(name):
+            try:
+                os.remove(os.path.join(_DISK_CACHE_DIR, name))
+            except OSError:
+                pass
 
 
 def get_parsha_from_hebcal(target_date: date) -> Optional[str]:
@@ -92,7 +231,7 @@ def get_parsha_from_hebcal(target_date: date) -> Optional[str]:
         Hebrew parsha name with prefix, or None if not found
     """
     # Special cases for Torah reading during holidays
-    jewcal_obj = JewCal(gregorian_date=target_date, diaspora=False)
+    jewcal_obj = get_jewcal_cached(target_date, False)
     if jewcal_obj.has_events() and jewcal_obj.events.yomtov:
         event_name = jewcal_obj.events.yomtov
         # Simchat Torah and Hoshana Rabba read "Vezot Haberakhah"
@@ -105,19 +244,34 @@ def get_parsha_from_hebcal(target_date: date) -> Optional[str]:
     # Find the Saturday of the week containing target_date
     saturday = _get_saturday_for_date(target_date)
 
+    # Every city and every day of the week resolves to the same Saturday
+    if saturday in _parsha_by_saturday:
+        return _parsha_by_saturday[saturday]
+
     # Use Hebcal as the authoritative source first. The bundled local data is
     # only a fallback, because an older generated snapshot may contain diaspora
     # readings for weeks when Israel and the diaspora are out of sync.
     data = _get_hebcal_data_for_year(saturday.year)
+    result = _resolve_parsha_for_saturday(data, saturday)
+
+    # Only remember answers backed by Hebcal data, so a run that started
+    # offline picks up the authoritative reading once the API is reachable.
+    if data:
+        _parsha_by_saturday[saturday] = result
+    return result
+
+
+def _resolve_parsha_for_saturday(data: Optional[Dict[str, Any]], saturday: date) -> Optional[str]:
+    """Resolve the Hebrew parsha for a Saturday from Hebcal data, then local data."""
     if data:
         # Find the parsha for our specific Saturday
-        parsha_title = _find_parsha_for_date(data, saturday)
+        parsha_title = _find_parsha_for_date(saturday.year, data, saturday)
         if parsha_title:
             parsha_clean = parsha_title.replace("Parashat ", "").strip()
             return translate_parsha(parsha_clean)
 
         # If exact match not found, find the closest Saturday before our target
-        parsha_title = _find_closest_parsha_before_date(data, saturday)
+        parsha_title = _find_closest_parsha_before_date(saturday.year, data, saturday)
         if parsha_title:
             parsha_clean = parsha_title.replace("Parashat ", "").strip()
             return translate_parsha(parsha_clean)
@@ -149,33 +303,37 @@ def _build_hebcal_url(year: int) -> str:
     )
 
 
-def _find_parsha_for_date(data: Dict[str, Any], saturday: date) -> Optional[str]:
-    """Find the parsha title for a specific Saturday in Hebcal data."""
-    target_date_str = saturday.isoformat()
+def _build_parsha_index(data: Dict[str, Any]) -> Dict[str, str]:
+    """Map each parashat date (YYYY-MM-DD) in Hebcal data to its title."""
+    index: Dict[str, str] = {}
     for item in data.get("items", []):
-        if item.get("category") == "parashat" and item.get("date") == target_date_str:
-            return item.get("title")
-    return None
+        if item.get("category") == "parashat" and item.get("date"):
+            # Keep the first entry per date, matching the original scan order
+            index.setdefault(item["date"], item.get("title"))
+    return index
 
 
-def _find_closest_parsha_before_date(data: Dict[str, Any], saturday: date) -> Optional[str]:
-    """Find the parsha title closest to but not after the target Saturday."""
-    closest_parsha = None
-    closest_date = None
+def _get_parsha_index(year: int, data: Dict[str, Any]) -> Dict[str, str]:
+    """Return the (cached) date -> parsha title index for a year's Hebcal data."""
+    index = _parsha_index_cache.get(year)
+    if index is None:
+        index = _parsha_index_cache[year] = _build_parsha_index(data)
+    return index
 
-    for item in data.get("items", []):
-        if item.get("category") != "parashat":
-            continue
-        item_date_str = item.get("date", "")
-        if not item_date_str:
-            continue
-        try:
-            item_date = date.fromisoformat(item_date_str)
-            if item_date <= saturday and (closest_date is None or item_date > closest_date):
-                closest_date = item_date
-                closest_parsha = item.get("title")
-        except ValueError:
-            continue
-
-    return closest_parsha
 
+def _find_parsha_for_date(year: int, data: Dict[str, Any], saturday: date) -> Optional[str]:
+    """Find the parsha title for a specific Saturday in Hebcal data."""
+    return _get_parsha_index(year, data).get(saturday.isoformat())
+
+
+def _find_closest_parsha_before_date(year: int, data: Dict[str, Any], saturday: date) -> Optional[str]:
+    """Find the parsha title closest to but not after the target Saturday."""
+    index = _get_parsha_index(year, data)
+    dates = _parsha_dates_cache.get(year)
+    if dates is None:
+        dates = _parsha_dates_cache[year] = sorted(index)
+
+    pos = bisect.bisect_right(dates, saturday.isoformat())
+    if pos == 0:
+        return None
+    return index[dates[pos - 1]]
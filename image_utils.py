@@ -11,8 +11,10 @@ This module provides image processing utilities including:
 - GIF frame extraction and assembly
 """
 
+import math
 import os
-from typing import List, Optional, Tuple
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
 
 import arabic_reshaper
 from bidi.algorithm import get_display
@@ -20,11 +22,24 @@ from PIL import Image, ImageDraw, ImageFont
 
 
 # ========= TEXT HELPERS =========
+@lru_cache(maxsize=4096)
+def _fix_hebrew_cached(text: str) -> str:
+    """Run the reshape + bidi pipeline once per distinct string."""
+    return get_display(arabic_reshaper.reshape(text))
+
+
 def fix_hebrew(text: str) -> str:
-    """Convert Hebrew text to proper RTL display format."""
-    if not text:
+    """
+    Convert Hebrew text to proper RTL display format.
+
+    Results are memoized: headers, city names and titles repeat across every
+    poster, and get_fitted_font/wrap_hebrew_text measure the same strings
+    several times while sizing them.
+    """
+    # ASCII has no RTL characters, so reshape + bidi would return it unchanged
+    if not text or text.isascii():
         return text
-    return get_display(arabic_reshaper.reshape(text))
+    return _fix_hebrew_cached(text)
 
 
 # ========= FONT LOADING =========
@@ -46,6 +61,18 @@ _FONT_CANDIDATES_REGULAR = [
 ]
 
 
+@lru_cache(maxsize=2)
+def _existing_font_paths(bold: bool) -> Tuple[str, ...]:
+    """
+    Return the font candidates that exist on disk, resolved once per weight.
+
+    The filesystem scan is independent of the font size, so doing it once keeps
+    size-stepping callers like get_fitted_font from re-stating every candidate.
+    """
+    candidates = _FONT_CANDIDATES_BOLD if bold else _FONT_CANDIDATES_REGULAR
+    return tuple(path for path in candidates if os.path.isfile(path))
+
+
 def load_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     """
     Load a font with caching for performance.
@@ -64,25 +91,35 @@ def load_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
         font, _ = _font_cache[cache_key]
         return font
 
-    candidates = _FONT_CANDIDATES_BOLD if bold else _FONT_CANDIDATES_REGULAR
-
-    for path in candidates:
-        if os.path.isfile(path):
-            try:
-                font = ImageFont.truetype(path, size=size)
-                # Store font with its bold state
-                font._is_bold = bold  # type: ignore
-                _font_cache[cache_key] = (font, bold)
-                return font
-            except Exception:
-                continue
-
-    # Fall back to default font (not cached as it's a different type)
+    for path in _existing_font_paths(bold):
+        try:
+            font = ImageFont.truetype(path, size=size)
+            # Store font with its bold state
+            font._is_bold = bold  # type: ignore
+            _font_cache[cache_key] = (font, bold)
+            return font
+        except Exception:
+            continue
+
+    # Fall back to default font. Cached too, so a missing font file doesn't
+    # cost a fresh load_default() on every call of size-stepping loops.
     default_font = ImageFont.load_default()
     default_font._is_bold = False  # type: ignore
+    _font_cache[cache_key] = (default_font, False)
     return default_font
 
 
+def warm_font_cache(specs: Iterable[Tuple[int, bool]]) -> None:
+    """
+    Load fonts ahead of time so the first render doesn't pay the TTF parse.
+
+    Args:
+        specs: (size, bold) pairs to load into the font cache
+    """
+    for size, bold in specs:
+        load_font(size, bold)
+
+
 # ========= IMAGE HELPERS =========
 # EXIF orientation tag and rotation values
 _EXIF_ORIENTATION_TAG = 274
@@ -118,6 +155,24 @@ def fix_image_orientation(img: Image.Image) -> Image.Image:
     return img
 
 
+def _draft_for_cover(img: Image.Image, size: Tuple[int, int]) -> None:
+    """
+    Let libjpeg decode a JPEG at a reduced 1/2, 1/4 or 1/8 scale when possible.
+
+    The requested draft size is the smallest image that still covers the target
+    in either orientation (EXIF rotation happens after decoding), so the LANCZOS
+    pass in _fit_background_fixed always downsamples. No-op for other formats.
+    """
+    if img.format != "JPEG":
+        return
+    base_w, base_h = size
+    src_w, src_h = img.size
+    scale = max(base_w / src_w, base_h / src_h, base_w / src_h, base_h / src_w)
+    if scale >= 0.5:
+        return
+    img.draft("RGB", (math.ceil(src_w * scale), math.ceil(src_h * scale)))
+
+
 def fit_background(
     image_path: str,
     size: Tuple[int, int] = (1080, 1080),
@@ -138,9 +193,33 @@ def fit_background(
                          constraints instead of forcing a fixed size.
 
     Returns:
-        Resized and cropped PIL Image
+        Resized and cropped PIL Image (a fresh copy the caller may modify)
     """
-    img = Image.open(image_path).convert("RGB")
+    # Default backgrounds recur across API requests; key on the file's
+    # mtime and size so an edited or replaced file is decoded again.
+    stat = os.stat(image_path)
+    if crop_position is not None:
+        crop_position = tuple(crop_position)
+    return _fit_background_cached(
+        image_path, stat.st_mtime_ns, stat.st_size,
+        tuple(size), crop_position, flexible_aspect,
+    ).copy()
+
+
+@lru_cache(maxsize=8)
+def _fit_background_cached(
+    image_path: str,
+    mtime_ns: int,
+    file_size: int,
+    size: Tuple[int, int],
+    crop_position: Optional[Tuple[float, float]],
+    flexible_aspect: bool,
+) -> Image.Image:
+    """Decode and fit a background once per file version; callers must copy."""
+    img = Image.open(image_path)
+    if not flexible_aspect:
+        _draft_for_cover(img, size)
+    img = img.convert("RGB")
 
     # Fix orientation based on EXIF data
     img = fix_image_orientation(img)
@@ -153,6 +232,10 @@ def fit_background(
         return _fit_background_fixed(img, size, crop_position)
 
 
+# Pillow resize() reducing_gap for background downscaling
+_REDUCING_GAP = 3.0
+
+
 def _fit_background_fixed(
     img: Image.Image,
     size: Tuple[int, int],
@@ -166,10 +249,10 @@ def _fit_background_fixed(
     base_w, base_h = size
 
     # Scale to cover the target size
-    scale = max(base_w / img.width, base_h / img.height)
-    new_w = int(img.width * scale)
-    new_h = int(img.height * scale)
-    img = img.resize((new_w, new_h), Image.LANCZOS)
+    src_w, src_h = img.size
+    scale = max(base_w / src_w, base_h / src_h)
+    new_w = int(src_w * scale)
+    new_h = int(src_h * scale)
 
     # Use provided crop position or default to center (0.5, 0.5)
     crop_x, crop_y = crop_position if crop_position else (0.5, 0.5)
@@ -186,8 +269,24 @@ def _fit_background_fixed(
     left = int(max_left * crop_x)
     top = int(max_top * crop_y)
 
-    img = img.crop((left, top, left + base_w, top + base_h))
-    return img
+    # Already at the cover size (e.g. a 1080x1350 upload for a 1080x1080
+    # poster): a plain crop is exact, so skip the LANCZOS convolution.
+    if (new_w, new_h) == (src_w, src_h):
+        return img.crop((left, top, left + base_w, top + base_h))
+
+    # Map the crop window back into source pixels and let resize() sample only
+    # that region, so the full new_w x new_h intermediate is never allocated.
+    x_ratio = src_w / new_w
+    y_ratio = src_h / new_h
+    box = (
+        left * x_ratio,
+        top * y_ratio,
+        (left + base_w) * x_ratio,
+        (top + base_h) * y_ratio,
+    )
+    # reducing_gap lets Pillow box-reduce very large sources (>= 6x) before
+    # the LANCZOS pass; 3.0 is visually indistinguishable from plain LANCZOS.
+    return img.resize((base_w, base_h), Image.LANCZOS, box=box, reducing_gap=_REDUCING_GAP)
 
 
 # Flexible aspect ratio constraints
@@ -239,7 +338,8 @@ def _fit_background_flexible(
         target_height = int(width / _MIN_ASPECT_RATIO)
         needs_crop = True
 
-    # Apply crop if needed to adjust aspect ratio
+    # Crop box needed to adjust aspect ratio
+    box = None
     if needs_crop:
         # Calculate crop position based on percentage
         max_left = width - target_width
@@ -248,16 +348,20 @@ def _fit_background_flexible(
         left = int(max_left * crop_x)
         top = int(max_top * crop_y)
 
-        img = img.crop((left, top, left + target_width, top + target_height))
-        width, height = img.size
+        box = (left, top, left + target_width, top + target_height)
+        width, height = target_width, target_height
 
-    # Resize to fit within max dimension while maintaining aspect ratio
+    # Resize to fit within max dimension while maintaining aspect ratio.
+    # The crop is fused into the resample via box=, so the oversize cropped
+    # intermediate is never allocated.
     max_dim = max(max_size)
     if max(width, height) > max_dim:
         ratio = max_dim / max(width, height)
         new_width = int(width * ratio)
         new_height = int(height * ratio)
-        img = img.resize((new_width, new_height), Image.LANCZOS)
+        img = img.resize((new_width, new_height), Image.LANCZOS, box=box, reducing_gap=_REDUCING_GAP)
+    elif box is not None:
+        img = img.crop(box)
 
     # Ensure minimum dimensions (scale up if needed, which is rare)
     width, height = img.size
@@ -311,22 +415,42 @@ def get_fitted_font(
     Returns:
         Font that fits the text (or min_size font if nothing fits)
     """
-    current_size = original_font.size
     is_bold = getattr(original_font, '_is_bold', False)
 
     # Check if original font fits
     if get_text_width(text, original_font, rtl) <= max_width:
         return original_font
 
+    return load_font(
+        _fitted_font_size(text, original_font.size, is_bold, max_width, rtl, min_size),
+        bold=is_bold,
+    )
+
+
+@lru_cache(maxsize=256)
+def _fitted_font_size(
+    text: str,
+    size: int,
+    bold: bool,
+    max_width: int,
+    rtl: bool,
+    min_size: int,
+) -> int:
+    """
+    Step the font size down until text fits; memoized per string and width.
+
+    Titles, subtitles and Omer texts repeat across posters, so the
+    measure-and-shrink loop runs once per distinct string.
+    """
     # Find the largest font size that fits
+    current_size = size
     while current_size > min_size:
         current_size -= 2
-        test_font = load_font(current_size, bold=is_bold)
-        if get_text_width(text, test_font, rtl) <= max_width:
-            return test_font
+        if get_text_width(text, load_font(current_size, bold=bold), rtl) <= max_width:
+            return current_size
 
-    # Return minimum size font if nothing fits
-    return load_font(min_size, bold=is_bold)
+    # Return minimum size if nothing fits
+    return min_size
 
 
 def draw_text_with_stroke(draw, xy, text, font, fill, stroke_fill, stroke_width, anchor=None, rtl=False):
@@ -0,0 +1,180 @@
+"""
+Shared module for rendering the web UI index page.
+
+Both the FastAPI service (service.py) and the Vercel handler (api/index.py)
+serve the same page, built from api/template.html and the GeoJSON city list,
+so the rendering lives here instead of being duplicated in each entrypoint.
+"""
+
+import gzip
+import hashlib
+import html
+import os
+import re
+from email.utils import formatdate
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+from cities import CityDict, get_cities_list
+
+# HTML template shared by all entrypoints (single source of truth)
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api", "template.html")
+
+# URL the page's stylesheet is served from, split out of the template
+STYLESHEET_PATH = "/app.css"
+
+# Browsers may reuse the page for 5 minutes, then serve it stale while they
+# revalidate in the background (a deploy shows up within minutes)
+INDEX_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
+
+# Web font stylesheet the template links to
+FONTS_STYLESHEET_URL = "https://fonts.googleapis.com/css2?family=Heebo:wght@400;500;600;700&display=swap"
+
+
+# One picker option per city; filled with str.format_map
+_CITY_OPTION_TEMPLATE = (
+    '        <div class="city-option" data-name="{name}" data-selected="false">'
+    '<span class="city-check-icon">✓</span><span class="city-name">{name}</span>'
+    '<div class="offset-input"><input type="number" class="candle-offset" value="{candle_offset}" '
+    'min="0" max="60" title="דקות לפני השקיעה"><span class="offset-label">ד\'</span></div></div>'
+)
+
+
+def build_city_checkboxes(cities: Iterable[CityDict]) -> str:
+    """Build the city picker options, one per city, with a candle offset input."""
+    # Use html.escape to handle city names with quotes (e.g., עין הנצי"ב);
+    # escaped once, the name is safe both as attribute value and as text
+    return "\n".join(
+        _CITY_OPTION_TEMPLATE.format_map(
+            {"name": html.escape(city["name"], quote=True), "candle_offset": city["candle_offset"]}
+        )
+        for city in cities
+    )
+
+
+def render_index_html(cities: Optional[Iterable[CityDict]] = None) -> str:
+    """
+    Render the index page HTML.
+
+    Args:
+        cities: Cities to offer in the picker (default: all GeoJSON cities)
+
+    Returns:
+        The complete HTML page
+    """
+    if cities is None:
+        cities = get_cities_list()
+
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        html_template = f.read()
+
+    return html_template.replace("CITY_CHECKBOXES_PLACEHOLDER", build_city_checkboxes(cities))
+
+
+def _split_stylesheet(page: str) -> Tuple[str, str, str]:
+    """Split a page around its inline <style> block: (before, css, after)."""
+    start = page.find("<style>")
+    end = page.find("</style>", start)
+    if start == -1 or end == -1:
+        return page, "", ""
+    return page[:start], page[start + len("<style>"):end], page[end + len("</style>"):]
+
+
+# CSS strings are matched first so nothing inside quotes (e.g. content: "…")
+# is mistaken for a comment or rewritten
+_CSS_STRING = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+_CSS_COMMENT_RE = re.compile(rf"({_CSS_STRING})|/\*.*?\*/", re.S)
+_CSS_SPACE_RE = re.compile(rf"({_CSS_STRING})|\s*;?\s*(\}})\s*|\s*([{{;,>]|:(?=\s))\s*|\s+")
+
+
+def _minify_css(css: str) -> str:
+    """
+    Strip comments and redundant whitespace from the stylesheet.
+
+    Deliberately conservative: spaces are only dropped around braces,
+    semicolons, commas, child combinators and after declaration colons, so
+    selectors like "a :hover" and expressions like calc(1px + 2px) keep
+    their meaning.
+    """
+    css = _CSS_COMMENT_RE.sub(lambda m: m.group(1) or "", css)
+    return _CSS_SPACE_RE.sub(
+        lambda m: m.group(1) or m.group(2) or (m.group(3) or " ")[0], css
+    ).strip()
+
+
+def _fingerprint(body: bytes) -> str:
+    """Short content hash used for ETags and cache-busting versions."""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _compress(body: bytes) -> bytes:
+    """Gzip once at the highest level; mtime=0 keeps the output stable."""
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+@lru_cache(maxsize=1)
+def _build_index_assets(template_mtime_ns: int) -> Tuple[Tuple[bytes, bytes, str, str], Tuple[bytes, bytes, str]]:
+    """Render, encode, compress and fingerprint the page and its stylesheet."""
+    before, css, after = _split_stylesheet(render_index_html())
+
+    # The stylesheet is most of the page but only changes with the template,
+    # so serve it separately under a versioned URL browsers cache for good
+    css_body = _minify_css(css).encode("utf-8")
+    css_version = _fingerprint(css_body)
+    if css:
+        page = f'{before}<link rel="stylesheet" href="{STYLESHEET_PATH}?v={css_version}" />{after}'
+    else:
+        page = before
+
+    body = page.encode("utf-8")
+    last_modified = formatdate(template_mtime_ns / 1e9, usegmt=True)
+    return (
+        (body, _compress(body), f'"{_fingerprint(body)}"', last_modified),
+        (css_body, _compress(css_body), css_version),
+    )
+
+
+def get_index_page() -> Tuple[bytes, bytes, str, str]:
+    """
+    Return the index page as (UTF-8 body, gzipped body, strong ETag, Last-Modified).
+
+    The template is ~250 KB and the city list is fixed per deploy, so the
+    page is built and compressed once and served from memory. Keying on the
+    template's mtime picks up edits during local development without a
+    restart. The ETag identifies the uncompressed body.
+    """
+    return _build_index_assets(os.stat(TEMPLATE_PATH).st_mtime_ns)[0]
+
+
+def get_stylesheet() -> Tuple[bytes, bytes, str]:
+    """
+    Return the page's stylesheet as (UTF-8 body, gzipped body, version).
+
+    The page links it as STYLESHEET_PATH?v=<version>, so a response for the
+    current version can be cached indefinitely.
+    """
+    return _build_index_assets(os.stat(TEMPLATE_PATH).st_mtime_ns)[1]
+
+
+def get_index_link_header() -> str:
+    """
+    Return a Link header for the index page.
+
+    It lets browsers open the font connections and fetch both stylesheets
+    while the (large) HTML is still downloading.
+    """
+    version = get_stylesheet()[2]
+    return ", ".join([
+        f"<{STYLESHEET_PATH}?v={version}>; rel=preload; as=style",
+        f"<{FONTS_STYLESHEET_URL}>; rel=preload; as=style",
+        "<https://fonts.googleapis.com>; rel=preconnect",
+        "<https://fonts.gstatic.com>; rel=preconnect; crossorigin",
+    ])
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """True if an If-None-Match header lists any of the given ETags (or *)."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in tags or any(etag in tags for etag in etags)
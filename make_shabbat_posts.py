@@ -7,8 +7,11 @@ calculations and PIL for image generation.
 """
 
 import argparse
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date, timedelta
+from functools import lru_cache
 from io import BytesIO
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
@@ -19,7 +22,6 @@ import arabic_reshaper
 import pytz
 import requests
 from bidi.algorithm import get_display
-from jewcal import JewCal
 from jewcal.models.zmanim import Location
 from PIL import Image, ImageDraw, ImageFont
 
@@ -42,9 +44,13 @@ from calendar_utils import (
     find_next_event_date,
     find_next_sequence,
     get_effective_start_date,
+    get_jewcal_cached,
+    get_sequence_event_info,
+    get_sequence_zmanim,
     is_end_of_holiday_sequence,
+    iter_sequences,
     jewcal_times_for_date,
-    jewcal_times_for_sequence,
+    jewcal_times_for_sequence,  # noqa: F401 - re-exported; tests import it from here
     next_friday,
 )
 
@@ -65,6 +71,7 @@ from image_utils import (
     is_video_file,
     load_font,
     overlay_watermark,
+    warm_font_cache,
 )
 
 # Type aliases for clarity
@@ -117,6 +124,23 @@ ASPECT_RATIO_SIZES = {
     "auto": None,          # Use flexible aspect ratio based on original image
 }
 
+# PNG encoding: a low zlib level with no optimize pass. optimize=True re-runs
+# the max-level compressor and dominated poster generation (~4.5 s of ~5 s)
+# for roughly 20% smaller files; posters are shared once and re-encoded anyway.
+# Offline runs that care about file size can raise it (0-9) via the environment.
+PNG_COMPRESS_LEVEL = int(os.getenv("PNG_COMPRESS_LEVEL", "1"))
+
+# Lossy WebP quality for clients that accept it; posters are photo + text,
+# so WebP is several times smaller than PNG at no visible cost
+WEBP_QUALITY = 85
+
+# (size, bold) of the fonts every poster draws with, for loading them ahead
+# of rendering (in batch pool workers, or at server startup)
+POSTER_FONTS = ((100, True), (54, False), (60, True), (36, False), (50, False), (42, False))
+
+# Background image types picked up from the images directory
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
 
 def _convert_year_to_hebrew_letters(year: int) -> str:
     """
@@ -153,17 +177,20 @@ def _convert_year_to_hebrew_letters(year: int) -> str:
     return result
 
 
+@lru_cache(maxsize=1024)
 def get_hebrew_date_string(gregorian_date: date) -> str:
     """
     Get the Hebrew date string for a given Gregorian date.
 
+    Memoized: every poster for the same week formats the same start/end dates.
+
     Args:
         gregorian_date: The Gregorian date to convert
 
     Returns:
         Hebrew date string like "כ״ג כסלו תשפ״ו"
     """
-    jc = JewCal(gregorian_date=gregorian_date, diaspora=False)
+    jc = get_jewcal_cached(gregorian_date, False)
     jewish_date = jc.jewish_date
 
     # Get day, month name, and year
@@ -226,6 +253,62 @@ from hebcal_api import get_parsha_from_hebcal, clear_hebcal_cache, _get_saturday
 # Israel timezone constant for time conversions
 _ISRAEL_TZ = pytz.timezone('Asia/Jerusalem')
 
+# Zero-padded "00".."99" for building HH:MM and DD.MM strings without strftime
+_TWO_DIGITS = tuple(f"{i:02d}" for i in range(100))
+
+
+@lru_cache(maxsize=64)
+def _israel_offset_minutes(date_str: str) -> Optional[int]:
+    """
+    Return Israel's UTC offset in minutes around a YYYY-MM-DD date.
+
+    Returns None when the offset changes anywhere from the day before to the
+    day after (DST transitions), so callers fall back to a full conversion.
+    """
+    try:
+        d = date.fromisoformat(date_str)
+    except ValueError:
+        return None
+    offsets = {
+        _ISRAEL_TZ.utcoffset(datetime.combine(d + timedelta(days=delta), datetime.min.time()))
+        for delta in (-1, 0, 1, 2)
+    }
+    if len(offsets) != 1:
+        return None
+    return int(offsets.pop().total_seconds()) // 60
+
+
+def _iso_to_hhmm_fast(iso_str: str) -> Optional[str]:
+    """
+    Convert a fixed-shape "YYYY-MM-DDTHH:MM:SS[.ffffff](Z|±HH:MM)" string by slicing.
+
+    Returns None for any other shape or near DST transitions.
+    """
+    if len(iso_str) < 20 or iso_str[10] != "T" or iso_str[13] != ":":
+        return None
+    if iso_str[-1] == "Z":
+        src_offset = 0
+    elif iso_str[-6] in "+-" and iso_str[-3] == ":":
+        # Leave malformed offsets to the fromisoformat fallback
+        if not (iso_str[-5:-3].isdigit() and iso_str[-2:].isdigit()):
+            return None
+        src_offset = int(iso_str[-5:-3]) * 60 + int(iso_str[-2:])
+        if iso_str[-6] == "-":
+            src_offset = -src_offset
+    else:
+        return None
+    israel_offset = _israel_offset_minutes(iso_str[:10])
+    if israel_offset is None:
+        return None
+    hour = iso_str[11:13]
+    minute = iso_str[14:16]
+    if not (hour.isdigit() and minute.isdigit()):
+        return None
+    if src_offset == israel_offset:
+        return f"{hour}:{minute}"
+    total = (int(hour) * 60 + int(minute) - src_offset + israel_offset) % (24 * 60)
+    return f"{_TWO_DIGITS[total // 60]}:{_TWO_DIGITS[total % 60]}"
+
 
 def iso_to_hhmm(iso_str: Optional[str]) -> str:
     """
@@ -240,9 +323,14 @@ def iso_to_hhmm(iso_str: Optional[str]) -> str:
     if not iso_str:
         return "--:--"
 
+    # Fast path for the fixed-shape strings produced by jewcal/Hebcal
+    fast = _iso_to_hhmm_fast(iso_str)
+    if fast is not None:
+        return fast
+
     try:
-        # Parse the datetime string
-        dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+        # Parse the datetime string (fromisoformat accepts "Z" since 3.11)
+        dt = datetime.fromisoformat(iso_str)
 
         if dt.tzinfo is None:
             # If no timezone info, assume UTC
@@ -250,11 +338,27 @@ def iso_to_hhmm(iso_str: Optional[str]) -> str:
 
         # Convert to Israel time
         israel_time = dt.astimezone(_ISRAEL_TZ)
-        return israel_time.strftime("%H:%M")
+        return f"{_TWO_DIGITS[israel_time.hour]}:{_TWO_DIGITS[israel_time.minute]}"
     except (ValueError, AttributeError):
         return "--:--"
 
 
+def _format_gregorian_range(seq_start: date, seq_end: date) -> str:
+    """
+    Format a sequence's Gregorian dates for the subtitle.
+
+    Examples: "24.01.2025" (single day), "24-25.01.2025" (same month),
+    "31.01-01.02.2025" (spans months or years).
+    """
+    sd, sm, sy = seq_start.day, seq_start.month, seq_start.year
+    ed, em, ey = seq_end.day, seq_end.month, seq_end.year
+    if seq_start == seq_end:
+        return f"{_TWO_DIGITS[sd]}.{_TWO_DIGITS[sm]}.{sy}"
+    if sm == em and sy == ey:
+        return f"{sd}-{ed}.{_TWO_DIGITS[em]}.{ey}"
+    return f"{_TWO_DIGITS[sd]}.{_TWO_DIGITS[sm]}-{_TWO_DIGITS[ed]}.{_TWO_DIGITS[em]}.{ey}"
+
+
 def wrap_hebrew_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
     """
     Wrap Hebrew text to fit within max_width.
@@ -338,21 +442,171 @@ def draw_multiline_text_with_stroke(
 
 
 # ========= COMPOSER =========
-def compose_poster(
-    bg_img: Image.Image,
-    week_info: dict,
-    all_cities_rows: list,
-    blessing_text: str | None = None,
-    dedication_text: str | None = None,
-    date_format: str = "gregorian",  # "gregorian", "hebrew", or "both"
-    show_watermark: bool = True,  # Enable/disable watermark
+# City table (font size, row spacing) by number of cities, clamped to 4..8
+_CITY_ROW_SIZING = {
+    4: (50, 10),  # Standard sizing for 4 or fewer cities
+    5: (42, 6),   # Medium sizing for 5-6 cities
+    6: (42, 6),
+    7: (36, 4),   # Compact sizing for 7-8 cities
+    8: (36, 4),
+}
+
+# Column header labels (candle lighting, exit) by event type
+_HEADER_LABELS_SHABBAT = ("כניסת שבת", "צאת שבת")
+_HEADER_LABELS_YOMTOV = ("הדלקת נרות", "צאת החג")
+# Yom Tov connecting to Shabbat - havdalah is actually Shabbat exit
+_HEADER_LABELS_YOMTOV_SHABBAT = ("הדלקת נרות", "צאת השבת")
+
+
+@lru_cache(maxsize=16)
+def _rounded_panel(width: int, height: int, corner_radius: int = 25) -> Image.Image:
+    """
+    Return the translucent rounded backdrop used behind poster content.
+
+    Only a handful of sizes occur (they depend on city count and layout), so
+    the panel is drawn once per size. The result is shared: copy before drawing.
+    """
+    panel = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    # ציור ריבוע עגול עם פינות מעוגלות
+    ImageDraw.Draw(panel).rounded_rectangle(
+        [0, 0, width, height],
+        radius=corner_radius,
+        fill=(0, 0, 0, 70)
+    )
+    return panel
+
+
+@lru_cache(maxsize=32)
+def _build_table_overlay(
+    table_width: int,
+    table_height: int,
+    city_font_size: int,
+    row_spacing: int,
+    header_labels: Tuple[str, str],
+    rows: Tuple[Tuple[str, str, str], ...],
 ) -> Image.Image:
-    img = bg_img.copy()
-    W, H = img.size
-    draw = ImageDraw.Draw(img)
+    """
+    Render the times table (rounded backdrop, headers and city rows) as an RGBA layer.
+
+    The table does not depend on the background, so every poster for the same
+    week (batch runs, GIF/video frames) pastes one cached layer instead of
+    re-rasterizing ~3 stroked strings per row. Callers must not mutate it.
+    """
+    city_row_font = load_font(city_font_size)
+    fill = "white"
+    stroke = "black"
+    stroke_w = 5
+
+    # יצירת רקע עגול קטן יותר - copy the shared panel before drawing on it
+    overlay = _rounded_panel(table_width, table_height).copy()
+    draw = ImageDraw.Draw(overlay)
+
+    # פיזור אחיד של העמודות בתוך הריבוע השחור עם רווחים שווים מכל הצדדים
+    margin = 40  # רווח אחיד מקצוות הריבוע השחור
+    usable_width = table_width - (2 * margin)  # רוחב זמין לטקסט
+    col_spacing = usable_width // 4  # חלוקה ל-4 חלקים שווים
+
+    col_hav_x    = margin + col_spacing * 0.5    # זמן יציאה - שמאל
+    col_candle_x = margin + col_spacing * 2      # זמן כניסה - אמצע
+    col_city_x   = margin + col_spacing * 3.5    # עיר - ימין
+    y = 30
+
+    # כותרות עמודות - ממורכזות (use same font as rows for consistency)
+    candle_label, hav_label = header_labels
+    draw_text_with_stroke(draw, (col_city_x, y), "עיר", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
+    draw_text_with_stroke(draw, (col_candle_x, y), candle_label, city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
+    draw_text_with_stroke(draw, (col_hav_x, y), hav_label, city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
+    y += city_font_size + row_spacing
+
+    if not rows:
+        return overlay
+
+    # נתונים ממורכזים בכל עמודה - one multiline call per column.
+    # PIL advances multiline text by the stroked height of "A" plus `spacing`,
+    # so solve for the spacing that keeps the original per-row step.
+    row_step = city_font_size + row_spacing - 2
+    line_height = city_row_font.getbbox("A", stroke_width=stroke_w)[3] + stroke_w
+    spacing = row_step - line_height
+
+    city_block = "\n".join(fix_hebrew(name) for name, _, _ in rows)
+    candle_block = "\n".join(candle_hhmm for _, candle_hhmm, _ in rows)
+    hav_block = "\n".join(hav_hhmm for _, _, hav_hhmm in rows)
+    for x, block in ((col_city_x, city_block), (col_candle_x, candle_block), (col_hav_x, hav_block)):
+        draw.multiline_text(
+            (x, y), block, font=city_row_font, fill=fill,
+            stroke_width=stroke_w, stroke_fill=stroke,
+            anchor="ma", spacing=spacing, align="center",
+        )
+
+    return overlay
+
+
+def _bottom_layout(H: int, show_blessing: bool, show_dedication: bool) -> Tuple[int, int | None, int | None]:
+    """Return (table_bottom_ref, blessing_y, dedication_y) for the bottom texts shown."""
+    blessing_y = dedication_y = None
+    if show_blessing and show_dedication:
+        # Normal layout with both blessing and dedication
+        blessing_y = H - 125
+        dedication_y = H - 50
+        table_bottom_ref = blessing_y
+    elif show_blessing and not show_dedication:
+        # Only blessing, no dedication
+        blessing_y = H - 85
+        table_bottom_ref = blessing_y
+    elif not show_blessing and show_dedication:
+        # Only dedication, no blessing
+        dedication_y = H - 50
+        table_bottom_ref = H - 85  # Table comes closer to bottom
+    else:
+        # Neither blessing nor dedication
+        table_bottom_ref = H - 40  # Table very close to bottom
+    return table_bottom_ref, blessing_y, dedication_y
+
+
+@lru_cache(maxsize=8)
+def _build_text_layer(size: Tuple[int, int], title: str, sub_line: str) -> Image.Image:
+    """
+    Render the title and subtitle on a transparent RGBA layer.
+
+    Like the table overlay, this depends only on the text, so posters sharing
+    an event and every GIF/video frame paste one cached layer. It goes under
+    the table, which can reach the subtitle on short canvases or with many
+    cities. Callers must not mutate it.
+    """
+    W, _ = size
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
 
     title_font = load_font(100, bold=True)
     sub_font   = load_font(54)
+
+    stroke_w = 5
+    fill = "white"
+    stroke = "black"
+
+    # התאמת גודל פונט לכותרת הראשית
+    fitted_title_font = get_fitted_font(title, title_font, W - 100, rtl=True)
+    draw_text_with_stroke(draw, (W//2, 40), title, fitted_title_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
+
+    # התאמת גודל פונט לכותרת המשנה
+    fitted_sub_font = get_fitted_font(sub_line, sub_font, W - 100, rtl=True)
+    draw_text_with_stroke(draw, (W//2, 145), sub_line, fitted_sub_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
+
+    return layer
+
+
+@lru_cache(maxsize=8)
+def _build_bottom_text_layer(size: Tuple[int, int], blessing_text: str, dedication_text: str) -> Image.Image:
+    """
+    Render the blessing and dedication on a transparent RGBA layer.
+
+    Pasted over the table, like the cached title layer goes under it.
+    Callers must not mutate it.
+    """
+    W, H = size
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+
     bless_font = load_font(60, bold=True)
     small_font = load_font(36)
 
@@ -360,6 +614,41 @@ def compose_poster(
     fill = "white"
     stroke = "black"
 
+    _, blessing_y, dedication_y = _bottom_layout(H, bool(blessing_text), bool(dedication_text))
+
+    # Only draw blessing text if it's shown
+    if blessing_y is not None:
+        draw_text_with_stroke(
+            draw, (W//2, blessing_y),
+            blessing_text, bless_font,
+            fill, stroke, stroke_w,
+            anchor="ma", rtl=True,
+        )
+    # Only draw dedication text if it's shown
+    if dedication_y is not None:
+        draw_text_with_stroke(
+            draw, (W//2, dedication_y),
+            dedication_text, small_font,
+            fill, stroke, 3,
+            anchor="ma", rtl=True,
+        )
+
+    return layer
+
+
+def compose_poster(
+    bg_img: Image.Image,
+    week_info: dict,
+    all_cities_rows: list,
+    blessing_text: str | None = None,
+    dedication_text: str | None = None,
+    date_format: str = "gregorian",  # "gregorian", "hebrew", or "both"
+    show_watermark: bool = True,  # Enable/disable watermark
+    copy_bg: bool = True,  # False lets a caller that owns bg_img skip the copy
+) -> Image.Image:
+    img = bg_img.copy() if copy_bg else bg_img
+    W, H = img.size
+
     # Determine title based on event type
     event_info = week_info.get("event_info", {})
     event_type = event_info.get("event_type", "shabbos")
@@ -401,10 +690,6 @@ def compose_poster(
     if week_info.get("main_title_override"):
         title = week_info["main_title_override"]
 
-    # התאמת גודל פונט לכותרת הראשית
-    fitted_title_font = get_fitted_font(title, title_font, W - 100, rtl=True)
-    draw_text_with_stroke(draw, (W//2, 40), title, fitted_title_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-
     # Create subtitle with parsha and date range
     parsha_txt = parsha or ""  # Use parsha already retrieved above
 
@@ -413,14 +698,7 @@ def compose_poster(
     if seq_start and seq_end:
         # Gregorian date formatting
         if date_format in ("gregorian", "both"):
-            if seq_start == seq_end:
-                greg_str = seq_start.strftime("%d.%m.%Y")
-            else:
-                if seq_start.month == seq_end.month and seq_start.year == seq_end.year:
-                    greg_str = f"{seq_start.day}-{seq_end.day}.{seq_end.month:02d}.{seq_end.year}"
-                else:
-                    greg_str = f"{seq_start.strftime('%d.%m')}-{seq_end.strftime('%d.%m.%Y')}"
-            date_str = greg_str
+            date_str = _format_gregorian_range(seq_start, seq_end)
 
         # Hebrew date formatting
         if date_format in ("hebrew", "both"):
@@ -488,26 +766,9 @@ def compose_poster(
     if week_info.get("subtitle_override"):
         sub_line = week_info["subtitle_override"]
 
-    # התאמת גודל פונט לכותרת המשנה
-    fitted_sub_font = get_fitted_font(sub_line, sub_font, W - 100, rtl=True)
-    draw_text_with_stroke(draw, (W//2, 145), sub_line, fitted_sub_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-
     # Adjust font size and spacing based on number of cities
     num_cities = len(all_cities_rows)
-    if num_cities <= 4:
-        # Standard sizing for 4 or fewer cities
-        city_font_size = 50
-        row_spacing = 10
-    elif num_cities <= 6:
-        # Medium sizing for 5-6 cities
-        city_font_size = 42
-        row_spacing = 6
-    else:
-        # Compact sizing for 7-8 cities
-        city_font_size = 36
-        row_spacing = 4
-
-    city_row_font = load_font(city_font_size)
+    city_font_size, row_spacing = _CITY_ROW_SIZING[min(max(num_cities, 4), 8)]
 
     # Calculate table dimensions
     table_height = (num_cities + 1) * (city_font_size + row_spacing) + 40
@@ -521,99 +782,40 @@ def compose_poster(
         dedication_text = ""
 
     # Position table dynamically based on what text is shown
-    # Calculate bottom section based on what's visible
-    show_blessing = bool(blessing_text)
-    show_dedication = bool(dedication_text)
-
-    if show_blessing and show_dedication:
-        # Normal layout with both blessing and dedication
-        blessing_y = H - 125
-        dedication_y = H - 50
-        table_bottom_ref = blessing_y
-    elif show_blessing and not show_dedication:
-        # Only blessing, no dedication
-        blessing_y = H - 85
-        table_bottom_ref = blessing_y
-    elif not show_blessing and show_dedication:
-        # Only dedication, no blessing
-        dedication_y = H - 50
-        table_bottom_ref = H - 85  # Table comes closer to bottom
-    else:
-        # Neither blessing nor dedication
-        table_bottom_ref = H - 40  # Table very close to bottom
+    table_bottom_ref, _, _ = _bottom_layout(H, bool(blessing_text), bool(dedication_text))
 
     table_to_blessing_gap = 10  # Consistent gap between table bottom and text
     table_top = table_bottom_ref - table_to_blessing_gap - table_height
 
-    # יצירת רקע עגול קטן יותר
-    overlay = Image.new("RGBA", (table_width, table_height), (0,0,0,0))
-    overlay_draw = ImageDraw.Draw(overlay)
-
-    # ציור ריבוע עגול עם פינות מעוגלות - קטן יותר
-    corner_radius = 25
-    overlay_draw.rounded_rectangle(
-        [0, 0, table_width, table_height],
-        radius=corner_radius,
-        fill=(0, 0, 0, 70)
-    )
-
-    # מרכוז הטבלה אופקית
-    table_left = (W - table_width) // 2
-    img.paste(overlay, (table_left, table_top), overlay)
-
-    draw = ImageDraw.Draw(img)
-    # פיזור אחיד של העמודות בתוך הריבוע השחור עם רווחים שווים מכל הצדדים
-    margin = 40  # רווח אחיד מקצוות הריבוע השחור
-    usable_width = table_width - (2 * margin)  # רוחב זמין לטקסט
-    col_spacing = usable_width // 4  # חלוקה ל-4 חלקים שווים
-
-    col_hav_x    = table_left + margin + col_spacing * 0.5    # זמן יציאה - שמאל
-    col_candle_x = table_left + margin + col_spacing * 2      # זמן כניסה - אמצע
-    col_city_x   = table_left + margin + col_spacing * 3.5    # עיר - ימין
-    y = table_top + 30
-
-    # Update column headers based on event type
-    event_info = week_info.get("event_info", {})
-    event_type = event_info.get("event_type", "shabbos")
-
-    # כותרות עמודות - ממורכזות (use same font as rows for consistency)
-    draw_text_with_stroke(draw, (col_city_x, y), "עיר", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-
+    # Column headers depend on the event type
     if event_type == "yomtov" and is_shabbat:
-        # Yom Tov connecting to Shabbat - havdalah is actually Shabbat exit
-        draw_text_with_stroke(draw, (col_candle_x, y), "הדלקת נרות", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-        draw_text_with_stroke(draw, (col_hav_x, y), "צאת השבת", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
+        header_labels = _HEADER_LABELS_YOMTOV_SHABBAT
     elif event_type == "yomtov":
-        draw_text_with_stroke(draw, (col_candle_x, y), "הדלקת נרות", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-        draw_text_with_stroke(draw, (col_hav_x, y), "צאת החג", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
+        header_labels = _HEADER_LABELS_YOMTOV
     else:
-        draw_text_with_stroke(draw, (col_candle_x, y), "כניסת שבת", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-        draw_text_with_stroke(draw, (col_hav_x, y), "צאת שבת", city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-    y += city_font_size + row_spacing
+        header_labels = _HEADER_LABELS_SHABBAT
+
+    table_overlay = _build_table_overlay(
+        table_width,
+        table_height,
+        city_font_size,
+        row_spacing,
+        header_labels,
+        tuple(tuple(row) for row in all_cities_rows),
+    )
 
-    for name, candle_hhmm, hav_hhmm in all_cities_rows:
-        # נתונים ממורכזים בכל עמודה
-        draw_text_with_stroke(draw, (col_city_x, y), name, city_row_font, fill, stroke, stroke_w, anchor="ma", rtl=True)
-        draw_text_with_stroke(draw, (col_candle_x, y), candle_hhmm, city_row_font, fill, stroke, stroke_w, anchor="ma")
-        draw_text_with_stroke(draw, (col_hav_x, y), hav_hhmm, city_row_font, fill, stroke, stroke_w, anchor="ma")
-        y += city_font_size + row_spacing - 2
+    # Same stacking as drawing directly: title and subtitle, then the table
+    # (which may cover the subtitle), then blessing and dedication on top
+    text_layer = _build_text_layer((W, H), title, sub_line)
+    img.paste(text_layer, (0, 0), text_layer)
 
-    # Only draw blessing text if it's shown
-    if show_blessing:
-        draw_text_with_stroke(
-            draw, (W//2, blessing_y),
-            blessing_text, bless_font,
-            fill, stroke, stroke_w,
-            anchor="ma", rtl=True,
-        )
-    # Only draw dedication text if it's shown
-    if show_dedication:
-        draw_text_with_stroke(
-            draw, (W//2, dedication_y),
-            dedication_text, small_font,
-            fill, stroke, 3,
-            anchor="ma", rtl=True,
-        )
+    # מרכוז הטבלה אופקית
+    table_left = (W - table_width) // 2
+    img.paste(table_overlay, (table_left, table_top), table_overlay)
+
+    if blessing_text or dedication_text:
+        bottom_layer = _build_bottom_text_layer((W, H), blessing_text, dedication_text)
+        img.paste(bottom_layer, (0, 0), bottom_layer)
 
     # Add watermark if enabled
     if show_watermark:
@@ -772,22 +974,12 @@ def compose_omer_poster(
     if content_top + content_height > max_bottom:
         content_top = max_bottom - content_height
 
-    # Create semi-transparent overlay for content area
-    overlay = Image.new("RGBA", (content_width, content_height), (0, 0, 0, 0))
-    overlay_draw = ImageDraw.Draw(overlay)
-
-    corner_radius = 25
-    overlay_draw.rounded_rectangle(
-        [0, 0, content_width, content_height],
-        radius=corner_radius,
-        fill=(0, 0, 0, 70)
-    )
+    # Semi-transparent overlay for content area
+    overlay = _rounded_panel(content_width, content_height)
 
     content_left = (W - content_width) // 2
     img.paste(overlay, (content_left, content_top), overlay)
 
-    draw = ImageDraw.Draw(img)
-
     # Draw the Omer content
     y = content_top + vertical_padding
 
@@ -838,6 +1030,16 @@ def compose_omer_poster(
 
 
 # ========= MAIN =========
+def _encode_poster(img: Image.Image, output_format: str = "png") -> bytes:
+    """Encode a composed still poster as PNG bytes, or WebP when requested."""
+    buffer = BytesIO()
+    if output_format == "webp":
+        img.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        img.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
 def generate_poster(
     *,
     image_path: str,
@@ -855,6 +1057,7 @@ def generate_poster(
     omer_date: Optional[date] = None,  # Date for Omer calculation (default: today)
     omer_day: Optional[int] = None,  # Direct Omer day (1-49), overrides date-based calculation
     nusach: str = "sefard",  # Nusach for Omer counting: "sefard", "ashkenaz", or "edot_hamizrach"
+    output_format: str = "png",  # Still poster encoding: "png" or "webp"
 ) -> bytes:
     """
     Generate a single Shabbat/Yom Tov poster for one background image.
@@ -897,9 +1100,11 @@ def generate_poster(
                 - "sefard" (default): Uses "לָעֹמֶר"
                 - "ashkenaz": Uses "בָּעֹמֶר"
                 - "edot_hamizrach": Uses "לָעֹמֶר" with different structure
+        output_format: Encoding for still posters - "png" (default) or "webp".
+                       Animated backgrounds always produce a GIF.
 
     Returns:
-        PNG image bytes ready to be saved or transmitted
+        PNG (or WebP) image bytes ready to be saved or transmitted
     """
     # Use defaults if not provided
     # If start_date is not specified, use get_effective_start_date() which
@@ -964,36 +1169,29 @@ def generate_poster(
             nusach=nusach,
         )
 
-        # Save to BytesIO buffer as PNG and return bytes
-        buffer = BytesIO()
-        img.save(buffer, format="PNG", optimize=True)
-        return buffer.getvalue()
+        return _encode_poster(img, output_format)
 
     # === SHABBAT/YOM TOV MODE ===
     # Find the next event sequence (ignore event_type and event_name here,
-    # as they're obtained from jewcal_times_for_sequence for each city)
+    # as they're obtained from get_sequence_event_info below)
     seq_start, seq_end, _, _ = find_next_sequence(start_date)
 
-    # Compute parsha and zmanim for all cities
-    rows: List[CityRow] = []
-    parsha_name: Optional[str] = None
-    event_info: Optional[Dict[str, Any]] = None
+    # Event details and parsha are the same for every city in Israel, so
+    # resolve them once; only the zmanim are computed per city.
+    sequence_info = get_sequence_event_info(seq_start, seq_end)
+    parsha_name: Optional[str] = sequence_info["parsha"]
+    event_info: Dict[str, Any] = {
+        "event_name": sequence_info["event_name"],
+        "event_type": sequence_info["event_type"],
+        "action": sequence_info["action"],
+    }
 
+    rows: List[CityRow] = []
     for city in cities:
-        info = jewcal_times_for_sequence(
+        candle_iso, havdalah_iso = get_sequence_zmanim(
             city["lat"], city["lon"], seq_start, seq_end, city["candle_offset"]
         )
-        if not parsha_name and info.get("parsha"):
-            parsha_name = info["parsha"]
-        if not event_info:
-            event_info = {
-                "event_name": info.get("event_name"),
-                "event_type": info.get("event_type"),
-                "action": info.get("action"),
-            }
-        candle_hhmm = iso_to_hhmm(info.get("candle"))
-        hav_hhmm = iso_to_hhmm(info.get("havdalah"))
-        rows.append((city["name"], candle_hhmm, hav_hhmm))
+        rows.append((city["name"], iso_to_hhmm(candle_iso), iso_to_hhmm(havdalah_iso)))
 
     # Add custom cities with manual times (if provided)
     custom_cities = overrides.get("custom_cities") if overrides else None
@@ -1005,20 +1203,6 @@ def generate_poster(
             if name:
                 rows.append((name, candle, havdalah))
 
-    # If no predefined cities were processed (only custom cities),
-    # we still need event_info and parsha for the poster header.
-    # Use Jerusalem coordinates as reference point.
-    if not event_info:
-        # Jerusalem coordinates
-        ref_lat, ref_lon = 31.779737, 35.209554
-        ref_info = jewcal_times_for_sequence(ref_lat, ref_lon, seq_start, seq_end, 40)
-        parsha_name = ref_info.get("parsha")
-        event_info = {
-            "event_name": ref_info.get("event_name"),
-            "event_type": ref_info.get("event_type"),
-            "action": ref_info.get("action"),
-        }
-
     # Build week info
     week_info = {
         "parsha": parsha_name,
@@ -1059,6 +1243,8 @@ def generate_poster(
                 dedication_text=dedication_text,
                 date_format=date_format,
                 show_watermark=show_watermark,
+                # Flexible fitting may hand back the decoder's own frame object
+                copy_bg=bg is frame,
             )
             processed_frames.append(processed_frame)
 
@@ -1090,6 +1276,8 @@ def generate_poster(
                 dedication_text=dedication_text,
                 date_format=date_format,
                 show_watermark=show_watermark,
+                # Flexible fitting may hand back the decoder's own frame object
+                copy_bg=bg is frame,
             )
             processed_frames.append(processed_frame)
 
@@ -1104,24 +1292,91 @@ def generate_poster(
     )
 
     # Compose the poster image
+    # bg is a fresh image owned by this call, so draw on it in place
     img = compose_poster(
         bg, week_info, rows,
         blessing_text=blessing_text,
         dedication_text=dedication_text,
         date_format=date_format,
         show_watermark=show_watermark,
+        copy_bg=False,
     )
 
-    # Save to BytesIO buffer as PNG and return bytes
-    buffer = BytesIO()
-    img.save(buffer, format="PNG", optimize=True)
-    return buffer.getvalue()
+    return _encode_poster(img, output_format)
+
+
+# Posters rendered by one spawned pool worker before it is replaced
+_MAX_TASKS_PER_WORKER = 16
+
+
+def _pool_options() -> Dict[str, Any]:
+    """
+    ProcessPoolExecutor options for the batch pool.
+
+    Fork where available, so workers start from the parent's imported
+    modules and warm JewCal/Hebcal/font caches instead of re-importing PIL,
+    jewcal and the city list and fetching Hebcal on their own. Forked
+    workers can't be recycled (max_tasks_per_child requires spawn), but a
+    poster's images are released when its task returns. Elsewhere
+    workers are spawned, so recycle them to bound memory on long batches.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return {"mp_context": multiprocessing.get_context("fork")}
+    return {
+        "mp_context": multiprocessing.get_context("spawn"),
+        "max_tasks_per_child": _MAX_TASKS_PER_WORKER,
+    }
+
+
+def _is_up_to_date(out_name: str, img_path: str) -> bool:
+    """True if out_name exists and is newer than its background image."""
+    try:
+        return os.path.getmtime(out_name) >= os.path.getmtime(img_path)
+    except OSError:
+        return False
+
+
+def _generate_poster_task(task: Tuple[str, date, str]) -> str:
+    """
+    Process-pool worker for main(): render one poster and write it to disk.
+
+    Writing in the worker overlaps disk I/O with other workers' rendering and
+    avoids pickling megabytes of PNG bytes back to the parent.
+    """
+    img_path, search_date, out_name = task
+    # blessing_text and dedication_text left as defaults
+    poster_bytes = generate_poster(image_path=img_path, start_date=search_date)
+
+    # Save the poster bytes to disk. Write a temp file and rename it so an
+    # interrupted run never leaves a torn PNG that the up-to-date check
+    # would then skip.
+    os.makedirs(os.path.dirname(out_name), exist_ok=True)
+    tmp_name = f"{out_name}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_name, "wb") as f:
+            f.write(poster_bytes)
+        os.replace(tmp_name, out_name)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+    return out_name
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate Shabbat/Yom Tov posts with candle times")
     parser.add_argument("--images-dir", default="images", help="Input images folder")
     parser.add_argument("--start-date", default=None, help="YYYY-MM-DD, default is today -> next event")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Parallel worker processes for rendering (1 = render in-process)",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Regenerate posters even if an up-to-date output file already exists",
+    )
     args = parser.parse_args()
 
     if args.start_date:
@@ -1130,35 +1385,24 @@ def main():
         start_base = date.today()
 
     # Find event sequences instead of individual events
-    exts = {".jpg", ".jpeg", ".png", ".webp"}
-    images = [os.path.join(args.images_dir, f) for f in sorted(os.listdir(args.images_dir))]
-    images = [p for p in images if os.path.splitext(p)[1].lower() in exts]
+    # Single pass over the directory; DirEntry caches the file type
+    with os.scandir(args.images_dir) as entries:
+        images = sorted(
+            e.path for e in entries
+            if os.path.splitext(e.name)[1].lower() in IMAGE_EXTENSIONS and e.is_file()
+        )
     if not images:
         raise SystemExit("No images found in input folder.")
 
-    current_search_date = start_base
-    processed_sequences = []  # Track which sequences we've already processed
-
-    for img_path in images:
-        # Find the next sequence (for naming the file and updating search date)
-        seq_start, seq_end, event_type, _ = find_next_sequence(current_search_date)
-
-        # Skip if we've already processed this sequence
-        if any(seq_start <= existing_end and seq_end >= existing_start
-               for existing_start, existing_end in processed_sequences):
-            # Move search date past this sequence
-            current_search_date = seq_end + timedelta(days=1)
-            seq_start, seq_end, event_type, _ = find_next_sequence(current_search_date)
-
-        processed_sequences.append((seq_start, seq_end))
-
-        # Generate the poster using the reusable function
-        poster_bytes = generate_poster(
-            image_path=img_path,
-            start_date=current_search_date,
-            # blessing_text and dedication_text left as defaults
-        )
+    tasks: List[Tuple[str, date, str]] = []  # (image_path, search_date, out_name)
 
+    # Resolve each image's sequence up front (cheap, and each depends on the
+    # previous one), then render the independent posters in parallel.
+    # iter_sequences resumes the day after each sequence ends, and the
+    # backward scan in find_event_sequence stops at that Havdalah, so
+    # consecutive sequences never overlap.
+    search_date = start_base
+    for img_path, (seq_start, seq_end, event_type, _) in zip(images, iter_sequences(start_base)):
         # Create filename based on event type and sequence
         event_type_str = event_type or "shabbos"
         if seq_start == seq_end:
@@ -1166,15 +1410,38 @@ def main():
         else:
             out_name = f"output/{event_type_str}_{seq_start.isoformat()}_to_{seq_end.isoformat()}_cities.png"
 
-        # Save the poster bytes to disk
-        os.makedirs(os.path.dirname(out_name), exist_ok=True)
-        with open(out_name, "wb") as f:
-            f.write(poster_bytes)
-        print(f"Generated file: {out_name}")
-
-        # Move to next sequence
-        current_search_date = seq_end + timedelta(days=1)
-
+        if not args.force and _is_up_to_date(out_name, img_path):
+            print(f"Skipping up-to-date file: {out_name}")
+        else:
+            tasks.append((img_path, search_date, out_name))
+
+        # The next poster searches from the day after this sequence
+        search_date = seq_end + timedelta(days=1)
+
+    if not tasks:
+        return
+
+    # Compose + PNG encode is CPU-bound, so use processes rather than threads.
+    # A single task or --workers 1 skips the pool (and its startup cost).
+    max_workers = min(len(tasks), max(1, args.workers))
+    if max_workers == 1:
+        for out_name in map(_generate_poster_task, tasks):
+            print(f"Generated file: {out_name}")
+        return
+
+    # Load fonts up front: forked workers inherit them, and spawned workers
+    # (no fork on this platform) load them once in the initializer instead
+    # of on their first poster
+    warm_font_cache(POSTER_FONTS)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=warm_font_cache,
+        initargs=(POSTER_FONTS,),
+        **_pool_options(),
+    ) as executor:
+        for out_name in executor.map(_generate_poster_task, tasks):
+            print(f"Generated file: {out_name}")
 
 if __name__ == "__main__":
     main()
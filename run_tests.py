@@ -3,14 +3,20 @@
 Test runner script for Shabbat poster generation tests.
 
 This script discovers and runs all unit tests in the tests/ directory.
-It uses Python's built-in unittest framework for compatibility.
+When pytest and pytest-xdist are installed, tests are spread across one
+worker process per CPU core; otherwise it falls back to Python's built-in
+unittest framework, so it runs with no extra dependencies.
 
 Usage:
     python run_tests.py                  # Run all tests
     python run_tests.py -v               # Run with verbose output
+    python run_tests.py -q               # Run quietly, without banners
     python run_tests.py tests.test_core  # Run specific test module
 """
 
+import argparse
+import glob
+import importlib.util
 import sys
 import unittest
 import os
@@ -20,11 +26,37 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
 
+tests_dir = os.path.join(project_root, 'tests')
+
+
+def _load_suite(pattern):
+    """Discover the tests in tests/ whose file names match the pattern."""
+    # Anchor discovery at the project root so it works from any directory
+    loader = unittest.TestLoader()
+    return loader.discover(tests_dir, pattern=pattern, top_level_dir=project_root)
+
+
+def _can_run_parallel():
+    """Return True if pytest and pytest-xdist are available."""
+    return all(importlib.util.find_spec(name) is not None for name in ("pytest", "xdist"))
+
+
+def _run_pytest(paths, verbosity):
+    """Run the given test paths with pytest, one worker per CPU core."""
+    import pytest
+
+    args = ["-n", "auto", "-v" if verbosity >= 2 else "-q", *paths]
+    # pytest exit code 5 means no tests were collected; treat as failure too
+    return 0 if pytest.main(args) == 0 else 1
+
+
 def run_all_tests(verbosity=2):
     """Discover and run all tests in the tests/ directory."""
+    if _can_run_parallel():
+        return _run_pytest([tests_dir], verbosity)
+
     # Discover all tests
-    loader = unittest.TestLoader()
-    suite = loader.discover('tests', pattern='test_*.py')
+    suite = _load_suite('test_*.py')
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=verbosity)
@@ -36,8 +68,14 @@ def run_all_tests(verbosity=2):
 
 def run_specific_tests(test_pattern, verbosity=2):
     """Run specific tests matching the pattern."""
-    loader = unittest.TestLoader()
-    suite = loader.discover('tests', pattern=f'{test_pattern}*.py')
+    if _can_run_parallel():
+        paths = sorted(glob.glob(os.path.join(tests_dir, f"{test_pattern}*.py")))
+        if not paths:
+            print(f"No test files match: {test_pattern}")
+            return 1
+        return _run_pytest(paths, verbosity)
+
+    suite = _load_suite(f'{test_pattern}*.py')
     
     runner = unittest.TextTestRunner(verbosity=verbosity)
     result = runner.run(suite)
@@ -46,38 +84,37 @@ def run_specific_tests(test_pattern, verbosity=2):
 
 
 if __name__ == "__main__":
-    # Parse command line arguments
-    verbosity = 2
-    test_pattern = None
-    
-    args = sys.argv[1:]
-    for arg in args:
-        if arg == '-v' or arg == '--verbose':
-            verbosity = 2
-        elif arg == '-q' or arg == '--quiet':
-            verbosity = 1
-        elif not arg.startswith('-'):
-            test_pattern = arg
-    
-    print("=" * 70)
-    print("Shabbat Poster Generation - Unit Tests")
-    print("=" * 70)
-    print()
-    
-    if test_pattern:
-        print(f"Running tests matching: {test_pattern}")
-        exit_code = run_specific_tests(test_pattern, verbosity)
-    else:
-        print("Running all tests...")
-        exit_code = run_all_tests(verbosity)
-    
-    print()
-    print("=" * 70)
-    if exit_code == 0:
-        print("All tests passed!")
+    parser = argparse.ArgumentParser(description="Run the Shabbat poster unit tests.")
+    parser.add_argument("pattern", nargs="?", help="Only run test files starting with this prefix")
+    parser.add_argument("-v", "--verbose", dest="verbosity", action="store_const", const=2,
+                        default=2, help="Verbose output (default)")
+    parser.add_argument("-q", "--quiet", dest="verbosity", action="store_const", const=1,
+                        help="Quiet output, without the banners")
+    args = parser.parse_args()
+    show_banner = args.verbosity >= 2
+
+    if show_banner:
+        print("=" * 70)
+        print("Shabbat Poster Generation - Unit Tests")
+        print("=" * 70)
+        print()
+
+    if args.pattern:
+        if show_banner:
+            print(f"Running tests matching: {args.pattern}")
+        exit_code = run_specific_tests(args.pattern, args.verbosity)
     else:
-        print("Some tests failed.")
-    print("=" * 70)
-    
-    sys.exit(exit_code)
+        if show_banner:
+            print("Running all tests...")
+        exit_code = run_all_tests(args.verbosity)
+
+    if show_banner:
+        print()
+        print("=" * 70)
+        if exit_code == 0:
+            print("All tests passed!")
+        else:
+            print("Some tests failed.")
+        print("=" * 70)
 
+    sys.exit(exit_code)
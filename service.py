@@ -1,21 +1,65 @@
-import html
+import asyncio
+import hashlib
+import json
 import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from typing import Any, Dict
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
-from fastapi import FastAPI, Body
-from fastapi.responses import Response, HTMLResponse, FileResponse
+import pytz
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, HTMLResponse, FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
+from anyio import CapacityLimiter, to_thread
 
-from api.poster import build_poster_from_payload
+from api.poster import (
+    CITY_BY_NAME,
+    build_poster_from_payload,
+    negotiate_output_format,
+    poster_media_type,
+    warm_up,
+)
 from api.upcoming_events import get_upcoming_events
-from cities import get_cities_list, build_city_lookup, map_city_payload
-from make_shabbat_posts import find_next_sequence
+from cities import map_city_payload
+from make_shabbat_posts import find_next_sequence, get_effective_start_date
 from hebcal_api import get_parsha_from_hebcal
+from index_page import (
+    INDEX_CACHE_CONTROL,
+    STYLESHEET_PATH,
+    etag_matches,
+    get_index_link_header,
+    get_index_page,
+    get_stylesheet,
+)
 from translations import YOMTOV_TRANSLATIONS
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load fonts and default backgrounds and build the index page before
+    # serving, so the first requests after a deploy are as fast as the rest
+    await to_thread.run_sync(warm_up)
+    await to_thread.run_sync(get_index_page)
+    yield
+
+
+class _TextGZipMiddleware(GZipMiddleware):
+    """Gzip responses except images, which are already compressed."""
+
+    async def __call__(self, scope, receive, send):
+        # Re-gzipping a ~1.5 MB poster PNG burns CPU for almost no savings
+        if scope["type"] == "http" and (
+            scope["path"] in ("/poster", "/favicon.ico") or scope["path"].startswith("/static/")
+        ):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(_TextGZipMiddleware, minimum_size=500, compresslevel=6)
 
 # Mount static files directory
 static_dir = os.path.join(os.path.dirname(__file__), "public", "static")
@@ -32,59 +76,237 @@ async def favicon():
     return Response(status_code=404)
 
 
-# Load cities once at startup (cached internally)
-GEOJSON_CITIES = get_cities_list()
-CITY_BY_NAME = build_city_lookup(GEOJSON_CITIES)
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """True if an Accept-Encoding header allows gzip (or any coding)."""
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+async def index(request: Request) -> Response:
+    page, gzip_page, etag, last_modified = get_index_page()
+    # Each encoding is its own representation, so it gets its own ETag
+    use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    gzip_etag = etag[:-1] + '-gzip"'
+    # Let browsers reuse the page briefly, then revalidate it
+    headers = {
+        "ETag": gzip_etag if use_gzip else etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": INDEX_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    # If-None-Match takes precedence over If-Modified-Since when both are sent
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag, gzip_etag):
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since") == last_modified:
+        return Response(status_code=304, headers=headers)
+    headers["Link"] = get_index_link_header()
+    if use_gzip:
+        # Precompressed at build time; the gzip middleware leaves responses
+        # that already carry a Content-Encoding alone
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(gzip_page, headers=headers)
+    return HTMLResponse(page, headers=headers)
+
+
+async def stylesheet(request: Request) -> Response:
+    css, gzip_css, version = get_stylesheet()
+    # The page links a versioned URL whose content never changes; anything
+    # else (e.g. a page from before a deploy) must revalidate
+    if request.query_params.get("v") == version:
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "no-cache"
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(gzip_css, media_type="text/css; charset=utf-8", headers=headers)
+    return Response(css, media_type="text/css; charset=utf-8", headers=headers)
+
+
+# The page and stylesheet are prebuilt bytes that only read headers, so
+# register them as plain Starlette routes and skip FastAPI's parameter
+# solving and response validation on these hot paths
+app.add_route("/", index, methods=["GET"])
+app.add_route(STYLESHEET_PATH, stylesheet, methods=["GET"])
+
+
+# ========= POSTER CACHE =========
+# Rendered posters by payload, so identical requests (the web UI re-posts on
+# every click) skip compositing and encoding. Bounded by entry count since a
+# poster is ~1-3 MB.
+_POSTER_CACHE_MAX_ENTRIES = 32
+_poster_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+_ISRAEL_TZ = pytz.timezone("Asia/Jerusalem")
+
+
+def _is_poster_cacheable(payload: Dict[str, Any]) -> bool:
+    """
+    False for payloads whose background can change behind the same payload.
+
+    An imageUrl may serve a new image at any time, and only the render's
+    conditional GET finds out, so those posters are always rendered.
+    imageBase64 takes precedence over imageUrl and is part of the payload.
+    """
+    return not payload.get("imageUrl") or bool(payload.get("imageBase64"))
+
+
+def _local_image_stamp(payload: Dict[str, Any]) -> str:
+    """Modification time and size of the local background image, if one is used."""
+    image_path = payload.get("image")
+    if payload.get("imageBase64") or payload.get("imageUrl") or not isinstance(image_path, str):
+        return ""
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return ""
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _poster_cache_key(payload: Dict[str, Any], output_format: str = "png") -> str:
+    """
+    Hash a payload together with the time context its defaults depend on.
+
+    Payloads without startDate/omerDate resolve against "now" (the effective
+    start date flips after havdalah, the Omer count at nightfall), so the key
+    includes the effective date and the current Israel hour. The negotiated
+    output format is part of the key too, as is the mtime of a local "image"
+    so editing that file invalidates its posters.
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    now = datetime.now(_ISRAEL_TZ)
+    context = (
+        f"{get_effective_start_date(now).isoformat()}|{now:%Y-%m-%dT%H}|{output_format}"
+        f"|{_local_image_stamp(payload)}"
+    )
+    return hashlib.blake2b(f"{context}|{canonical}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _remember_poster(key: str, poster_bytes: bytes) -> None:
+    """Store a rendered poster, evicting the least recently used entries."""
+    _poster_cache[key] = poster_bytes
+    _poster_cache.move_to_end(key)
+    while len(_poster_cache) > _POSTER_CACHE_MAX_ENTRIES:
+        _poster_cache.popitem(last=False)
+
+
+# Renders are CPU- and memory-heavy (full-size RGBA layers, PNG encode), so
+# cap how many run at once instead of sharing anyio's default 40 threads;
+# extra requests queue here while cheap endpoints keep their own threads.
+_RENDER_LIMITER = CapacityLimiter(os.cpu_count() or 1)
+
+# Renders currently running, by cache key, so concurrent identical requests
+# share one render instead of each starting their own
+_inflight: Dict[str, "asyncio.Task[bytes]"] = {}
 
-@app.get("/", response_class=HTMLResponse)
-async def index():
-    # Generate city checkboxes dynamically from GeoJSON data with offset input
-    # Use html.escape to handle city names with quotes (e.g., עין הנצי"ב)
-    city_checkboxes = "\n".join([
-        f'        <div class="city-option" data-name="{html.escape(city["name"], quote=True)}" data-selected="false"><span class="city-check-icon">✓</span><span class="city-name">{html.escape(city["name"])}</span><div class="offset-input"><input type="number" class="candle-offset" value="{city["candle_offset"]}" min="0" max="60" title="דקות לפני השקיעה"><span class="offset-label">ד\'</span></div></div>'
-        for city in GEOJSON_CITIES
-    ])
 
-    # Read HTML template from shared file (single source of truth)
-    template_path = os.path.join(os.path.dirname(__file__), "api", "template.html")
-    with open(template_path, "r", encoding="utf-8") as f:
-        html_template = f.read()
+async def _render_poster(key: str, payload: Dict[str, Any], output_format: str, cache: bool = True) -> bytes:
+    """Render a poster for the cache key and (if cache) remember the result."""
+    try:
+        # Map city names to full city objects with coordinates
+        map_city_payload(payload, CITY_BY_NAME)
 
-    return html_template.replace("CITY_CHECKBOXES_PLACEHOLDER", city_checkboxes)
+        # Rendering is blocking PIL/requests work; run it off the event loop
+        # so other requests keep being served meanwhile
+        poster_bytes = await to_thread.run_sync(
+            build_poster_from_payload, payload, output_format, limiter=_RENDER_LIMITER
+        )
+        if cache:
+            _remember_poster(key, poster_bytes)
+        return poster_bytes
+    finally:
+        _inflight.pop(key, None)
 
 
+def clear_poster_cache() -> None:
+    """Clear the rendered poster cache. Useful for testing."""
+    _poster_cache.clear()
 
 
 @app.post("/poster")
-async def create_poster(payload: Dict[str, Any] = Body(default={})):
+async def create_poster(request: Request):
     """
     FastAPI endpoint that:
     - Receives JSON payload
-    - Uses build_poster_from_payload to generate a PNG or GIF
+    - Uses build_poster_from_payload to generate a PNG, WebP or GIF
     - Returns image with appropriate content type
 
     If payload contains 'cities' as a list of city objects (with name and candle_offset),
     maps them to full city objects with coordinates from GeoJSON.
     """
+    # Parse the body directly: the payload is free-form, and Pydantic
+    # validation of Dict[str, Any] would walk every value (including
+    # multi-megabyte imageBase64 strings) without checking anything
+    body = await request.body()
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        return JSONResponse({"detail": "Invalid JSON body"}, status_code=422)
     if payload is None:
         payload = {}
+    if not isinstance(payload, dict):
+        return JSONResponse({"detail": "JSON body must be an object"}, status_code=422)
 
-    # Map city names to full city objects with coordinates
-    map_city_payload(payload, CITY_BY_NAME)
+    # Serve WebP to clients that ask for it, PNG otherwise
+    output_format = negotiate_output_format(request.headers.get("accept"))
 
-    poster_bytes = build_poster_from_payload(payload)
-
-    # Detect output format from magic bytes
-    # GIF starts with "GIF87a" or "GIF89a", PNG starts with \x89PNG
-    if poster_bytes[:6] in (b'GIF87a', b'GIF89a'):
-        media_type = "image/gif"
+    # Key on the payload as sent; city mapping below is deterministic
+    key = _poster_cache_key(payload, output_format)
+    cacheable = _is_poster_cacheable(payload)
+    poster_bytes = _poster_cache.get(key) if cacheable else None
+    if poster_bytes is not None:
+        _poster_cache.move_to_end(key)
     else:
-        media_type = "image/png"
+        task = _inflight.get(key)
+        if task is None:
+            task = _inflight[key] = asyncio.ensure_future(
+                _render_poster(key, payload, output_format, cache=cacheable)
+            )
+        # Shield so one client disconnecting doesn't cancel the shared render
+        poster_bytes = await asyncio.shield(task)
 
-    return Response(content=poster_bytes, media_type=media_type)
+    headers = {"Vary": "Accept"}
+    if cacheable:
+        headers.update({"ETag": f'"{key}"', "Cache-Control": "public, max-age=3600"})
+    return Response(
+        content=poster_bytes,
+        media_type=poster_media_type(poster_bytes),
+        headers=headers,
+    )
 
 
 @app.get("/upcoming-events")
 async def upcoming_events_endpoint():
     """Get upcoming Shabbat/holiday events for one year ahead."""
-    return get_upcoming_events()
+    # Building the list may fetch parsha data from Hebcal; keep that blocking
+    # work off the event loop so other requests are served meanwhile
+    events = await to_thread.run_sync(get_upcoming_events)
+    # The events are plain JSON types already, so serialize them directly
+    # instead of through FastAPI's jsonable_encoder (same output as Vercel)
+    body = json.dumps(events, ensure_ascii=False).encode("utf-8")
+    return Response(
+        content=body,
+        media_type="application/json; charset=utf-8",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Rendering is CPU-bound, so run one worker process per core by default.
+    # Each worker keeps its own poster cache; uvicorn[standard] already pulls
+    # in uvloop and httptools, which "auto" loop/http selection picks up.
+    uvicorn.run(
+        "service:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        loop="auto",
+        http="auto",
+    )
@@ -22,7 +22,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image
 
-from api.poster import build_poster_from_payload, is_safe_url
+from api.poster import (
+    build_poster_from_payload,
+    clear_image_url_cache,
+    is_safe_url,
+    negotiate_output_format,
+    poster_media_type,
+)
 
 
 def create_test_image_base64() -> str:
@@ -155,6 +161,34 @@ class TestBuildPosterFromPayload(unittest.TestCase):
 
         self.assertIn("Failed to download image", str(context.exception))
 
+    @patch('api.poster.requests.get')
+    def test_image_url_revalidated_with_etag(self, mock_get):
+        """Repeat imageUrl requests should send If-None-Match and reuse the file on 304."""
+        clear_image_url_cache()
+        img = Image.new("RGB", (100, 100), color="green")
+        buffer = BytesIO()
+        img.save(buffer, format="JPEG")
+
+        first = MagicMock()
+        first.status_code = 200
+        first.content = buffer.getvalue()
+        first.headers = {"ETag": '"abc"'}
+        not_modified = MagicMock()
+        not_modified.status_code = 304
+        not_modified.content = b""
+        mock_get.side_effect = [first, not_modified]
+
+        payload = {"imageUrl": "https://example.com/cached.jpg"}
+        try:
+            self.assertTrue(build_poster_from_payload(payload).startswith(b'\x89PNG'))
+            self.assertTrue(build_poster_from_payload(payload).startswith(b'\x89PNG'))
+        finally:
+            clear_image_url_cache()
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertNotIn("If-None-Match", mock_get.call_args_list[0].kwargs["headers"])
+        self.assertEqual(mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"], '"abc"')
+
     def test_payload_with_local_image_path(self):
         """Payload with local image path should work."""
         # Create a temporary image file
@@ -237,6 +271,22 @@ class TestApiOutputFormat(unittest.TestCase):
         # PNG might be RGBA or RGB
         self.assertIn(img.mode, ["RGB", "RGBA"])
 
+    def test_webp_output_when_requested(self):
+        """output_format="webp" should produce a WebP of the same size."""
+        result = build_poster_from_payload({}, output_format="webp")
+
+        self.assertEqual(poster_media_type(result), "image/webp")
+        img = Image.open(BytesIO(result))
+        self.assertEqual(img.format, "WEBP")
+        self.assertEqual(img.size, (1080, 1080))
+
+    def test_negotiate_output_format(self):
+        """Only an explicit image/webp in Accept should select WebP."""
+        self.assertEqual(negotiate_output_format(None), "png")
+        self.assertEqual(negotiate_output_format("*/*"), "png")
+        self.assertEqual(negotiate_output_format("image/avif,image/webp,*/*;q=0.8"), "webp")
+        self.assertEqual(negotiate_output_format("image/webp;q=0"), "png")
+
 
 class TestApiCitiesHandling(unittest.TestCase):
     """Tests for cities handling in API."""
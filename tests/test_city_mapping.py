@@ -18,6 +18,7 @@ from unittest.mock import patch
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cities import build_city_lookup, map_city_payload
+from index_page import build_city_checkboxes
 
 
 class TestCityMapping(unittest.TestCase):
@@ -183,6 +184,22 @@ class TestCityMapping(unittest.TestCase):
         self.assertEqual(self.CITY_BY_NAME["ירושלים"]["candle_offset"], 40)
 
 
+class TestCityCheckboxes(unittest.TestCase):
+    """Tests for the index page city picker markup."""
+
+    def test_city_names_escaped(self):
+        """City names with quotes should be escaped in attributes and text."""
+        markup = build_city_checkboxes([{"name": 'עין הנצי"ב', "candle_offset": 20}])
+
+        self.assertIn('data-name="עין הנצי&quot;ב"', markup)
+        self.assertIn('value="20"', markup)
+
+    def test_one_option_per_city(self):
+        """Each city should produce exactly one option line."""
+        cities = [{"name": "א", "candle_offset": 20}, {"name": "ב", "candle_offset": 30}]
+        self.assertEqual(len(build_city_checkboxes(cities).splitlines()), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -10,6 +10,7 @@ Tests cover:
 
 import os
 import sys
+import tempfile
 import unittest
 from datetime import date
 from io import BytesIO
@@ -18,7 +19,7 @@ from unittest.mock import patch, MagicMock
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from PIL import Image
+from PIL import Image, ImageDraw
 
 from make_shabbat_posts import (
     translate_parsha,
@@ -30,14 +31,22 @@ from make_shabbat_posts import (
     IMG_SIZE,
     PARASHA_TRANSLATION,
     _normalize_parsha_key,
+    _CITY_ROW_SIZING,
+    _HEADER_LABELS_SHABBAT,
+    _build_table_overlay,
+    _build_text_layer,
+    _format_gregorian_range,
+    _is_up_to_date,
 )
 from image_utils import (
     fix_hebrew,
     load_font,
     get_text_width,
     get_fitted_font,
+    draw_text_with_stroke,
     fix_image_orientation,
     fit_background,
+    warm_font_cache,
 )
 
 
@@ -61,6 +70,19 @@ class TestTextHelpers(unittest.TestCase):
         self.assertIsInstance(result, str)
         self.assertTrue(len(result) > 0)
 
+    def test_fix_hebrew_repeated_calls_are_cached(self):
+        """fix_hebrew should return the cached display string for repeated input."""
+        first = fix_hebrew("כניסת שבת")
+        second = fix_hebrew("כניסת שבת")
+        self.assertEqual(first, second)
+        self.assertIs(first, second)
+
+    def test_fix_hebrew_ascii_passthrough(self):
+        """ASCII text such as times should be returned as-is without reshaping."""
+        with patch("image_utils._fix_hebrew_cached") as mock_cached:
+            self.assertEqual(fix_hebrew("17:25"), "17:25")
+        mock_cached.assert_not_called()
+
 
 class TestParshaTranslation(unittest.TestCase):
     """Tests for parsha translation functionality."""
@@ -80,6 +102,11 @@ class TestParshaTranslation(unittest.TestCase):
         result = translate_parsha("Lech-Lecha")
         self.assertEqual(result, "פרשת לך לך")
 
+    def test_translate_combined_parsha_by_halves(self):
+        """translate_parsha should translate unlisted double-parsha spellings per half."""
+        result = translate_parsha("Matos-Mas'ei")
+        self.assertEqual(result, "פרשת מטות-מסעי")
+
     def test_translate_unknown_parsha(self):
         """translate_parsha should return original name for unknown parshas."""
         result = translate_parsha("UnknownParsha")
@@ -121,12 +148,49 @@ class TestIsoToHhmm(unittest.TestCase):
         result = iso_to_hhmm("not-a-date")
         self.assertEqual(result, "--:--")
 
+    def test_iso_to_hhmm_malformed_offset(self):
+        """iso_to_hhmm should return placeholder for a non-numeric UTC offset."""
+        result = iso_to_hhmm("2025-01-24T14:26:00+0a:00")
+        self.assertEqual(result, "--:--")
+
     def test_iso_to_hhmm_utc_timezone(self):
         """iso_to_hhmm should handle UTC (Z suffix) timezone."""
         result = iso_to_hhmm("2025-01-24T14:30:00Z")
         # Should convert to Israel time and return HH:MM
         self.assertRegex(result, r"^\d{2}:\d{2}$")
 
+    def test_iso_to_hhmm_converts_utc_offsets_to_israel_time(self):
+        """iso_to_hhmm should apply Israel's winter and summer offsets."""
+        self.assertEqual(iso_to_hhmm("2025-01-24T14:26:00.782223+00:00"), "16:26")
+        self.assertEqual(iso_to_hhmm("2025-07-04T16:30:00+00:00"), "19:30")
+        self.assertEqual(iso_to_hhmm("2025-07-04T19:30:00+03:00"), "19:30")
+
+    def test_iso_to_hhmm_dst_transition_day(self):
+        """iso_to_hhmm should stay correct on the day Israel changes clocks."""
+        # Israel moved to summer time on 2025-03-28 at 02:00 local time
+        self.assertEqual(iso_to_hhmm("2025-03-27T23:30:00+00:00"), "01:30")
+        self.assertEqual(iso_to_hhmm("2025-03-28T15:00:00+00:00"), "18:00")
+
+
+class TestFormatGregorianRange(unittest.TestCase):
+    """Tests for the subtitle Gregorian date formatting."""
+
+    def test_single_day(self):
+        """A single day should be fully zero-padded."""
+        self.assertEqual(_format_gregorian_range(date(2025, 1, 4), date(2025, 1, 4)), "04.01.2025")
+
+    def test_same_month(self):
+        """Same-month ranges should share the month and year."""
+        self.assertEqual(_format_gregorian_range(date(2025, 1, 3), date(2025, 1, 4)), "3-4.01.2025")
+
+    def test_across_months(self):
+        """Ranges spanning months should show both day.month pairs."""
+        self.assertEqual(_format_gregorian_range(date(2025, 1, 31), date(2025, 2, 1)), "31.01-01.02.2025")
+
+    def test_across_years(self):
+        """Ranges spanning years should show only the end year."""
+        self.assertEqual(_format_gregorian_range(date(2025, 12, 31), date(2026, 1, 1)), "31.12-01.01.2026")
+
 
 class TestFontLoading(unittest.TestCase):
     """Tests for font loading functionality."""
@@ -150,6 +214,25 @@ class TestFontLoading(unittest.TestCase):
         # Same cache key should return same object
         self.assertIs(font1, font2)
 
+    def test_warm_font_cache_preloads_fonts(self):
+        """warm_font_cache should leave the requested fonts in the cache."""
+        import image_utils
+        image_utils._font_cache.pop((83, False), None)
+        warm_font_cache([(83, False)])
+        self.assertIn((83, False), image_utils._font_cache)
+        self.assertIs(load_font(83), image_utils._font_cache[(83, False)][0])
+
+    def test_load_font_caches_default_fallback(self):
+        """The default-font fallback should also be cached."""
+        import image_utils
+        with patch('image_utils._existing_font_paths', return_value=()):
+            try:
+                font1 = load_font(77, bold=True)
+                font2 = load_font(77, bold=True)
+            finally:
+                image_utils._font_cache.pop((77, True), None)
+        self.assertIs(font1, font2)
+
 
 class TestNextFriday(unittest.TestCase):
     """Tests for next_friday date calculation."""
@@ -204,6 +287,35 @@ class TestImageHelpers(unittest.TestCase):
         finally:
             os.remove(temp_path)
 
+    def test_fit_background_large_jpeg(self):
+        """fit_background should fill the target size from a reduced JPEG decode."""
+        test_img = Image.new("RGB", (4000, 3000), color="purple")
+        temp_path = "/tmp/test_image_large.jpg"
+        test_img.save(temp_path, format="JPEG")
+
+        try:
+            result = fit_background(temp_path, (1080, 1080))
+            self.assertEqual(result.size, (1080, 1080))
+            self.assertEqual(result.mode, "RGB")
+        finally:
+            os.remove(temp_path)
+
+    def test_fit_background_reuses_decoded_file(self):
+        """Repeated calls should reuse the fitted image but return independent copies."""
+        test_img = Image.new("RGB", (1200, 900), color="orange")
+        temp_path = "/tmp/test_image_cached.png"
+        test_img.save(temp_path)
+
+        try:
+            first = fit_background(temp_path, (1080, 1080))
+            first.paste((0, 0, 0), (0, 0, 10, 10))
+            with patch("image_utils.Image.open", side_effect=AssertionError("decoded twice")):
+                second = fit_background(temp_path, (1080, 1080))
+            self.assertIsNot(first, second)
+            self.assertEqual(second.getpixel((0, 0)), first.getpixel((20, 20)))
+        finally:
+            os.remove(temp_path)
+
     def test_fix_image_orientation_no_exif(self):
         """fix_image_orientation should handle images without EXIF."""
         test_img = Image.new("RGB", (100, 100), color="green")
@@ -211,6 +323,104 @@ class TestImageHelpers(unittest.TestCase):
         self.assertEqual(result.size, (100, 100))
 
 
+class TestComposePoster(unittest.TestCase):
+    """Tests for poster composition."""
+
+    def test_table_overlay_is_reused_across_backgrounds(self):
+        """Posters for the same week should share one rendered table layer."""
+        week_info = {
+            "event_info": {"event_type": "shabbos", "event_name": "Shabbos"},
+            "seq_start": date(2025, 1, 24),
+            "seq_end": date(2025, 1, 25),
+            "parsha": "פרשת בא",
+        }
+        rows = [("ירושלים", "16:35", "17:50"), ("חיפה", "16:45", "17:51")]
+
+        _build_table_overlay.cache_clear()
+        first = compose_poster(Image.new("RGB", (1080, 1080), "red"), week_info, rows, show_watermark=False)
+        second = compose_poster(Image.new("RGB", (1080, 1080), "blue"), week_info, rows, show_watermark=False)
+
+        self.assertEqual(first.size, (1080, 1080))
+        self.assertEqual(second.size, (1080, 1080))
+        info = _build_table_overlay.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_copy_bg_false_draws_in_place(self):
+        """copy_bg=False should compose onto the given background without copying it."""
+        week_info = {"event_info": {"event_type": "shabbos"}, "parsha": "פרשת בא"}
+        bg = Image.new("RGB", (1080, 1080), "red")
+        self.assertIs(compose_poster(bg, week_info, [], show_watermark=False, copy_bg=False), bg)
+        self.assertIsNot(compose_poster(bg, week_info, [], show_watermark=False), bg)
+
+    def test_text_layer_matches_direct_drawing(self):
+        """The cached text layer should render the same pixels as drawing on the background."""
+        week_info = {
+            "event_info": {"event_type": "shabbos", "event_name": "Shabbos"},
+            "seq_start": date(2025, 1, 24),
+            "seq_end": date(2025, 1, 25),
+            "parsha": "פרשת בא",
+        }
+        bg = Image.effect_noise((1080, 1080), 80).convert("RGB")
+
+        _build_text_layer.cache_clear()
+        poster = compose_poster(bg, week_info, [], "שבת שלום", "הקדשה", show_watermark=False)
+        compose_poster(bg, week_info, [], "שבת שלום", "הקדשה", show_watermark=False)
+        self.assertEqual(_build_text_layer.cache_info().hits, 1)
+
+        expected = bg.copy()
+        draw = ImageDraw.Draw(expected)
+        title_font = get_fitted_font("שבת שלום", load_font(100, bold=True), 980, rtl=True)
+        draw_text_with_stroke(draw, (540, 40), "שבת שלום", title_font, "white", "black", 5, anchor="ma", rtl=True)
+        region = (0, 0, 1080, 140)
+        self.assertEqual(poster.crop(region).tobytes(), expected.crop(region).tobytes())
+
+        # A tall table on a short canvas reaches the subtitle: it must cover
+        # the subtitle and stay under the blessing and dedication
+        week_info = dict(week_info, main_title_override="שבת שלום", subtitle_override="פרשת בא | 24-25.1.2025")
+        rows = [(f"עיר {i}", "16:35", "17:50") for i in range(8)]
+        bg = Image.effect_noise((1080, 720), 80).convert("RGB")
+        poster = compose_poster(bg, week_info, rows, "שבת שלום ומבורך", "הקדשה", show_watermark=False)
+
+        expected = bg.copy()
+        draw = ImageDraw.Draw(expected)
+        draw_text_with_stroke(draw, (540, 40), "שבת שלום", title_font, "white", "black", 5, anchor="ma", rtl=True)
+        sub_line = "פרשת בא | 24-25.1.2025"
+        sub_font = get_fitted_font(sub_line, load_font(54), 980, rtl=True)
+        draw_text_with_stroke(draw, (540, 145), sub_line, sub_font, "white", "black", 5, anchor="ma", rtl=True)
+        city_font_size, row_spacing = _CITY_ROW_SIZING[8]
+        table_height = 9 * (city_font_size + row_spacing) + 40
+        table_top = 720 - 125 - 10 - table_height
+        self.assertLess(table_top, 145 + 54)
+        table = _build_table_overlay(880, table_height, city_font_size, row_spacing, _HEADER_LABELS_SHABBAT, tuple(rows))
+        expected.paste(table, (100, table_top), table)
+        draw = ImageDraw.Draw(expected)
+        draw_text_with_stroke(draw, (540, 595), "שבת שלום ומבורך", load_font(60, bold=True), "white", "black", 5, anchor="ma", rtl=True)
+        draw_text_with_stroke(draw, (540, 670), "הקדשה", load_font(36), "white", "black", 3, anchor="ma", rtl=True)
+        self.assertEqual(poster.tobytes(), expected.tobytes())
+
+    def test_table_rows_match_per_row_drawing(self):
+        """Column blocks should put every row at the same pixels as one draw call per cell."""
+        rows = (("ירושלים", "16:35", "17:50"), ("תל אביב", "16:50", "17:51"), ('עין הנצי"ב', "16:47", "17:49"))
+        labels = ("כניסה", "יציאה")
+        city_font_size, row_spacing = 42, 12
+        overlay = _build_table_overlay(900, 400, city_font_size, row_spacing, labels, rows)
+
+        # Headers only, then each cell drawn at its own row position
+        expected = _build_table_overlay(900, 400, city_font_size, row_spacing, labels, ()).copy()
+        draw = ImageDraw.Draw(expected)
+        font = load_font(city_font_size)
+        col_spacing = (900 - 80) // 4
+        y = 30 + city_font_size + row_spacing
+        for name, candle, havdalah in rows:
+            draw_text_with_stroke(draw, (40 + col_spacing * 3.5, y), name, font, "white", "black", 5, anchor="ma", rtl=True)
+            draw_text_with_stroke(draw, (40 + col_spacing * 2, y), candle, font, "white", "black", 5, anchor="ma")
+            draw_text_with_stroke(draw, (40 + col_spacing * 0.5, y), havdalah, font, "white", "black", 5, anchor="ma")
+            y += city_font_size + row_spacing - 2
+
+        self.assertEqual(overlay.tobytes(), expected.tobytes())
+
+
 class TestGetTextWidth(unittest.TestCase):
     """Tests for text width calculation."""
 
@@ -250,6 +460,35 @@ class TestGetFittedFont(unittest.TestCase):
         # Result font should have smaller or equal size
         self.assertLessEqual(result.size, original_font.size)
 
+    def test_get_fitted_font_memoizes_shrink_loop(self):
+        """Fitting the same text again should reuse the computed size."""
+        from image_utils import _fitted_font_size
+        original_font = load_font(100)
+        long_text = "A long line that needs a smaller font to fit"
+        _fitted_font_size.cache_clear()
+        first = get_fitted_font(long_text, original_font, 300)
+        second = get_fitted_font(long_text, original_font, 300)
+        self.assertIs(first, second)
+        self.assertEqual(_fitted_font_size.cache_info().hits, 1)
+
+
+class TestIsUpToDate(unittest.TestCase):
+    """Tests for the batch re-run skip check."""
+
+    def test_output_newer_than_image_is_up_to_date(self):
+        """Existing outputs newer than their image should be skipped; others regenerated."""
+        with tempfile.TemporaryDirectory() as tmp:
+            img_path = os.path.join(tmp, "bg.png")
+            out_path = os.path.join(tmp, "out.png")
+            self.assertFalse(_is_up_to_date(out_path, img_path))
+            for path in (img_path, out_path):
+                open(path, "wb").close()
+            os.utime(img_path, (1000, 1000))
+            os.utime(out_path, (2000, 2000))
+            self.assertTrue(_is_up_to_date(out_path, img_path))
+            os.utime(img_path, (3000, 3000))
+            self.assertFalse(_is_up_to_date(out_path, img_path))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -12,8 +12,10 @@ Tests cover:
 
 import os
 import sys
+import tempfile
 import unittest
 from datetime import date, datetime, timedelta
+from itertools import islice
 from unittest.mock import patch, MagicMock
 
 import pytz
@@ -33,6 +35,7 @@ from make_shabbat_posts import (
     is_end_of_holiday_sequence,
     CITIES,
 )
+from calendar_utils import get_sequence_event_info, get_sequence_zmanim, iter_sequences
 from hebcal_api import (
     get_parsha_from_hebcal,
     clear_hebcal_cache,
@@ -68,6 +71,18 @@ class TestFindNextSequence(unittest.TestCase):
         # Sequence should start on or after test_date
         self.assertGreaterEqual(seq_start, test_date)
 
+    def test_iter_sequences_matches_repeated_find_next_sequence(self):
+        """iter_sequences should yield the same consecutive sequences as manual stepping."""
+        start = date(2025, 9, 1)  # Covers the Tishrei holiday cluster
+        expected = []
+        current = start
+        for _ in range(8):
+            sequence = find_next_sequence(current)
+            expected.append(sequence)
+            current = sequence[1] + timedelta(days=1)
+
+        self.assertEqual(list(islice(iter_sequences(start), 8)), expected)
+
 
 class TestFindEventSequence(unittest.TestCase):
     """Tests for find_event_sequence function."""
@@ -241,6 +256,31 @@ class TestJewcalTimesForSequence(unittest.TestCase):
             f"Expected Shmini Atzeret/Simchat Torah, got: {result['event_name']}"
         )
 
+    def test_event_details_are_shared_across_cities(self):
+        """Event and parsha should match for all cities; only times differ."""
+        start_date = date(2025, 1, 24)
+        end_date = date(2025, 1, 25)
+        shared = get_sequence_event_info(start_date, end_date)
+
+        for city in CITIES:
+            result = jewcal_times_for_sequence(
+                city["lat"], city["lon"], start_date, end_date, city["candle_offset"]
+            )
+            for key in ("parsha", "event_name", "event_type", "action"):
+                self.assertEqual(result[key], shared[key])
+            self.assertEqual(
+                (result["candle"], result["havdalah"]),
+                get_sequence_zmanim(city["lat"], city["lon"], start_date, end_date, city["candle_offset"]),
+            )
+
+    def test_sequence_zmanim_are_memoized(self):
+        """Repeated zmanim lookups for the same city and sequence should hit the cache."""
+        get_sequence_zmanim.cache_clear()
+        first = get_sequence_zmanim(31.78, 35.22, date(2025, 1, 24), date(2025, 1, 25), 40)
+        second = get_sequence_zmanim(31.78, 35.22, date(2025, 1, 24), date(2025, 1, 25), 40)
+        self.assertEqual(first, second)
+        self.assertEqual(get_sequence_zmanim.cache_info().hits, 1)
+
 
 class TestIsEndOfHolidaySequence(unittest.TestCase):
     """Tests for is_end_of_holiday_sequence function."""
@@ -310,12 +350,23 @@ class TestMultipleCities(unittest.TestCase):
 class TestGetParshaFromHebcal(unittest.TestCase):
     """Tests for Hebcal API integration."""
 
+    def setUp(self):
+        """Keep mocked Hebcal responses out of the real on-disk cache."""
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self._cache_dir_patch = patch.object(hebcal_api, "_DISK_CACHE_DIR", self._cache_dir.name)
+        self._cache_dir_patch.start()
+
+    def tearDown(self):
+        clear_hebcal_cache()
+        self._cache_dir_patch.stop()
+        self._cache_dir.cleanup()
+
     def test_hebcal_url_uses_israel_schedule(self):
         """Hebcal API requests should ask for Israel Torah readings."""
         url = _build_hebcal_url(2026)
         self.assertIn("i=on", url)
 
-    @patch('hebcal_api.requests.get')
+    @patch('hebcal_api._SESSION.get')
     def test_get_parsha_prefers_authoritative_api_over_stale_local_data(self, mock_get):
         """API data should override stale local diaspora readings for Israel."""
         clear_hebcal_cache()
@@ -339,7 +390,26 @@ class TestGetParshaFromHebcal(unittest.TestCase):
         requested_url = mock_get.call_args.args[0]
         self.assertIn("i=on", requested_url)
 
-    @patch('hebcal_api.requests.get')
+    @patch('hebcal_api._SESSION.get')
+    def test_get_parsha_falls_back_to_closest_earlier_reading(self, mock_get):
+        """Without an exact match, the latest reading on or before the Saturday should win."""
+        clear_hebcal_cache()
+
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "items": [
+                {"category": "parashat", "date": "2025-01-18", "title": "Parashat Shemot"},
+                {"category": "parashat", "date": "2025-01-11", "title": "Parashat Vayechi"},
+                {"category": "parashat", "date": "2025-02-01", "title": "Parashat Bo"},
+            ]
+        }
+        mock_get.return_value = mock_response
+
+        result = get_parsha_from_hebcal(date(2025, 1, 25))
+
+        self.assertEqual(result, "פרשת שמות")
+
+    @patch('hebcal_api._SESSION.get')
     def test_get_parsha_uses_corrected_local_israel_data_on_network_error(self, mock_get):
         """Local fallback should contain Israel's 2026 post-Shavuot reading."""
         clear_hebcal_cache()
@@ -349,7 +419,7 @@ class TestGetParshaFromHebcal(unittest.TestCase):
         result = get_parsha_from_hebcal(date(2026, 5, 29))
         self.assertEqual(result, "פרשת בהעלותך")
 
-    @patch('hebcal_api.requests.get')
+    @patch('hebcal_api._SESSION.get')
     def test_get_parsha_handles_network_error(self, mock_get):
         """get_parsha_from_hebcal should use local data when API fails."""
         # Clear cache to ensure mock is called
@@ -362,7 +432,7 @@ class TestGetParshaFromHebcal(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIn("פרשת", result)  # Should have Hebrew parsha prefix
 
-    @patch('hebcal_api.requests.get')
+    @patch('hebcal_api._SESSION.get')
     def test_get_parsha_handles_empty_response(self, mock_get):
         """get_parsha_from_hebcal should use local data when API returns empty."""
         # Clear cache to ensure mock is called
@@ -378,6 +448,80 @@ class TestGetParshaFromHebcal(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIn("פרשת", result)  # Should have Hebrew parsha prefix
 
+    @patch('hebcal_api._SESSION.get')
+    def test_hebcal_response_is_persisted_to_disk_cache(self, mock_get):
+        """A fetched year should be served from disk after the memory cache is dropped."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"items": []}
+        mock_get.return_value = mock_response
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch.object(hebcal_api, "_DISK_CACHE_DIR", cache_dir):
+            clear_hebcal_cache()
+            hebcal_api._get_hebcal_data_for_year(2031)
+            hebcal_api._hebcal_cache.clear()
+            data = hebcal_api._get_hebcal_data_for_year(2031)
+            clear_hebcal_cache()
+
+        self.assertEqual(data, {"items": []})
+        self.assertEqual(mock_get.call_count, 1)
+
+
+    def test_clear_cache_only_purges_own_disk_entries(self):
+        """The disk purge is opt-in and leaves unrelated files alone."""
+        url = _build_hebcal_url(2031)
+        hebcal_api._write_disk_cache(url, {"items": []})
+        other = os.path.join(self._cache_dir.name, "settings.json")
+        with open(other, "w", encoding="utf-8") as f:
+            f.write("{}")
+
+        clear_hebcal_cache()
+        self.assertEqual(hebcal_api._read_disk_cache(url), {"items": []})
+
+        clear_hebcal_cache(disk=True)
+        self.assertIsNone(hebcal_api._read_disk_cache(url))
+        self.assertTrue(os.path.exists(other))
+
+    @patch('hebcal_api._SESSION.get')
+    def test_failed_fetch_is_not_retried_immediately(self, mock_get):
+        """A failed year should not be re-fetched for every subsequent lookup."""
+        mock_get.side_effect = Exception("Network error")
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch.object(hebcal_api, "_DISK_CACHE_DIR", cache_dir):
+            clear_hebcal_cache()
+            self.assertIsNone(hebcal_api._get_hebcal_data_for_year(2032))
+            self.assertIsNone(hebcal_api._get_hebcal_data_for_year(2032))
+            clear_hebcal_cache()
+
+        self.assertEqual(mock_get.call_count, 1)
+
+
+    @patch('hebcal_api._SESSION.get')
+    def test_parsha_is_cached_per_saturday_only_when_api_answers(self, mock_get):
+        """Offline fallbacks should not be pinned; API-backed answers should be."""
+        saturday = date(2026, 5, 30)
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch.object(hebcal_api, "_DISK_CACHE_DIR", cache_dir):
+            clear_hebcal_cache()
+            mock_get.side_effect = Exception("Network error")
+            get_parsha_from_hebcal(date(2026, 5, 28))
+            self.assertNotIn(saturday, hebcal_api._parsha_by_saturday)
+
+            clear_hebcal_cache()
+            mock_get.side_effect = None
+            mock_response = MagicMock()
+            mock_response.json.return_value = {
+                "items": [{"category": "parashat", "date": "2026-05-30", "title": "Parashat Nasso"}]
+            }
+            mock_get.return_value = mock_response
+            first = get_parsha_from_hebcal(date(2026, 5, 28))
+            second = get_parsha_from_hebcal(date(2026, 5, 29))
+            clear_hebcal_cache()
+
+        self.assertEqual(first, "פרשת נשא")
+        self.assertEqual(second, first)
+
 
 class TestGetEffectiveStartDate(unittest.TestCase):
     """Tests for get_effective_start_date function."""
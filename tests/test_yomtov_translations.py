@@ -19,6 +19,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the canonical translation dictionary from the shared module
 from translations import YOMTOV_TRANSLATIONS, get_main_title
+from translations import translate_yomtov as shared_translate_yomtov
 
 
 def translate_yomtov(event_name):
@@ -207,6 +208,19 @@ class TestYomTovUnknownEvents(unittest.TestCase):
         self.assertEqual(translate_yomtov("Before Pesach"), "Before Pesach")
 
 
+class TestSharedTranslateYomtov(unittest.TestCase):
+    """Tests for translations.translate_yomtov itself."""
+
+    def test_case_and_whitespace_variants(self):
+        """Case and surrounding whitespace should not prevent an exact-table hit."""
+        self.assertEqual(shared_translate_yomtov("  yom kippur "), "יום כיפור")
+        self.assertEqual(shared_translate_yomtov("SHAVUOT"), "שבועות")
+
+    def test_prefix_match_still_applies(self):
+        """Numbered days should still resolve through the prefix fallback."""
+        self.assertEqual(shared_translate_yomtov("Pesach VII"), YOMTOV_TRANSLATIONS["Pesach"])
+
+
 class TestCholHaMoedSpecialCase(unittest.TestCase):
     """Tests for Chol HaMoed special case on Shabbat."""
 
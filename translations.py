@@ -9,6 +9,7 @@ This module provides centralized translation dictionaries for:
 All translation data is consolidated here to avoid duplication across the codebase.
 """
 
+from functools import lru_cache
 from typing import Dict
 
 # ========= YOM TOV TRANSLATIONS =========
@@ -71,13 +72,22 @@ YOMTOV_TRANSLATIONS: Dict[str, str] = {
     "Yom Yerushalayim": "יום ירושלים",
 }
 
+# Case- and whitespace-insensitive view of YOMTOV_TRANSLATIONS, so minor
+# spelling variants hit a dict bucket before falling back to the prefix scan
+_YOMTOV_NORMALIZED_LOOKUP: Dict[str, str] = {
+    k.strip().lower(): v for k, v in YOMTOV_TRANSLATIONS.items()
+}
+
 
+@lru_cache(maxsize=256)
 def translate_yomtov(event_name: str) -> str:
     """
     Translate a Yom Tov (Jewish holiday) name from English to Hebrew.
 
-    Tries exact match first, then prefix matching for variations like
-    "Pesach I", "Sukkot II", etc.
+    Tries exact match first, then ignoring case and surrounding whitespace,
+    then prefix matching for variations like "Pesach I", "Sukkot II", etc.
+    Results are memoized since the prefix scan walks the whole table and the
+    same few names recur every call.
 
     Args:
         event_name: The English name of the holiday
@@ -87,6 +97,8 @@ def translate_yomtov(event_name: str) -> str:
     """
     # Try exact match first
     display_name = YOMTOV_TRANSLATIONS.get(event_name)
+    if not display_name:
+        display_name = _YOMTOV_NORMALIZED_LOOKUP.get(event_name.strip().lower())
     if not display_name:
         # Try matching prefix (for "Pesach I", "Sukkot II", etc.)
         for eng, heb in YOMTOV_TRANSLATIONS.items():
@@ -242,12 +254,15 @@ _PARASHA_NORMALIZED_LOOKUP: Dict[str, str] = {
 }
 
 
+@lru_cache(maxsize=256)
 def translate_parsha(english_name: str) -> str:
     """
     Translate English parsha name to Hebrew.
 
-    Uses O(1) dictionary lookup instead of iterating through all translations.
-    Handles various spelling variations (apostrophes, hyphens, spacing).
+    Uses O(1) dictionary lookup instead of iterating through all translations,
+    and memoizes results since the same few names recur across posters.
+    Handles various spelling variations (apostrophes, hyphens, spacing), and
+    combined parshiot whose halves are known individually.
 
     Args:
         english_name: English name of the parsha (e.g., "Bereshit", "Ha'Azinu")
@@ -268,6 +283,15 @@ def translate_parsha(english_name: str) -> str:
     if hebrew:
         return f"פרשת {hebrew}"
 
+    # Combined parshiot with a spelling not listed above: map each half
+    if "-" in clean_name:
+        halves = [
+            _PARASHA_NORMALIZED_LOOKUP.get(_normalize_parsha_key(part))
+            for part in clean_name.split("-")
+        ]
+        if all(halves):
+            return f"פרשת {'-'.join(halves)}"
+
     # Fallback: return original name with prefix
     return f"פרשת {clean_name}"
 